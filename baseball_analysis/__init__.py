@@ -1,8 +1,76 @@
-from .zone_analysis import fetch_gamepks
-from .zone_analysis import get_batting_order_of_game
-from .zone_analysis import convert_names_to_mlb_ids
-from .zone_analysis import get_swing_and_miss_rate_by_zone
-from .zone_analysis import get_called_strike_rate_by_zone
-from .zone_analysis import get_slugging_percentage_by_zone
-from .zone_analysis import get_on_base_percentage_by_zone
-from .zone_analysis import get_batting_average_by_zone
+import importlib
+
+# Public names and the submodule defining them. Submodules are only imported on first access,
+# so `import baseball_analysis` stays cheap and plotting libraries are not loaded unless used.
+_EXPORTS = {
+    'fetch_gamepks': 'zone_analysis',
+    'get_batting_order_of_game': 'zone_analysis',
+    'convert_names_to_mlb_ids': 'zone_analysis',
+    'get_swing_and_miss_rate_by_zone': 'zone_analysis',
+    'get_called_strike_rate_by_zone': 'zone_analysis',
+    'get_slugging_percentage_by_zone': 'zone_analysis',
+    'get_on_base_percentage_by_zone': 'zone_analysis',
+    'get_batting_average_by_zone': 'zone_analysis',
+    'compute_swing_and_miss_rate_by_zone': 'zone_analysis',
+    'compute_called_strike_rate_by_zone': 'zone_analysis',
+    'compute_slugging_percentage_by_zone': 'zone_analysis',
+    'compute_on_base_percentage_by_zone': 'zone_analysis',
+    'compute_batting_average_by_zone': 'zone_analysis',
+    'compute_zone_metrics': 'zone_engine',
+    'compute_zone_grids': 'zone_engine',
+    'ZoneGrid': 'zone_engine',
+    'compute_season_zone_grids': 'season',
+    'GameZonePartials': 'rolling',
+    'compute_rolling_zone_grids': 'rolling',
+    'slate_lineups': 'slate',
+    'compute_slate_zone_grids': 'slate',
+    'LocationGrid': 'heatmap',
+    'compute_location_grids': 'heatmap',
+    'ZoneCube': 'zone_cube',
+    'build_zone_cube': 'zone_cube',
+    'compute_zone_cube': 'zone_cube',
+    'LiveZoneTracker': 'live',
+    'follow_games': 'live',
+    'build_pitch_table': 'pitch_table',
+
+    'render_strike_zones': 'visualization',
+    'render_location_heatmaps': 'visualization',
+    'set_render_cache': 'visualization',
+    'set_game_cache': 'data_fetch',
+    'set_data_source': 'data_fetch',
+    'set_transport': 'data_fetch',
+    'GameFetchError': 'data_fetch',
+    'set_single_flight_cache': 'data_fetch',
+    'set_participation_index': 'data_fetch',
+    'Transport': 'transport',
+    'PitchStore': 'pitch_store',
+    'set_pitch_store': 'pitch_store',
+    'StatcastSource': 'statcast',
+    'ParticipationIndex': 'participation',
+    'lookup_mlb_ids': 'player_ids',
+    'lookup_player_names': 'player_ids',
+    'MemoryGameCache': 'cache',
+    'FileGameCache': 'cache',
+    'SQLiteGameCache': 'cache',
+    'SingleFlightCache': 'cache',
+    'RenderCache': 'cache',
+    'add_hook': 'instrumentation',
+    'remove_hook': 'instrumentation',
+    'collect_stats': 'instrumentation',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,342 @@
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from .instrumentation import count
+
+# Schedule statuses after which a game's play-by-play no longer changes
+FINAL_STATUSES = ('Final', 'Game Over', 'Completed Early')
+
+
+class GameCache:
+    """
+    Base class for play-by-play caches keyed by gamePk.
+
+    Entries stored as final never expire. Entries for games that are still in
+    progress are only served for `live_ttl` seconds after they were stored.
+    Subclasses implement `_load` and `_store`.
+    """
+
+    def __init__(self, live_ttl=60):
+        self.live_ttl = live_ttl
+
+    def get(self, gamepk):
+        """
+        Return the cached play-by-play document for a game, or None on a miss.
+        """
+        entry = self._load(int(gamepk))
+        if entry is None:
+            return None
+
+        data, final, stored_at = entry
+        if not final and time.time() - stored_at > self.live_ttl:
+            return None
+        return data
+
+    def set(self, gamepk, data, final=False):
+        """
+        Store a play-by-play document. Final games are kept forever.
+        """
+        self._store(int(gamepk), data, bool(final), time.time())
+
+    def _load(self, gamepk):
+        raise NotImplementedError
+
+    def _store(self, gamepk, data, final, stored_at):
+        raise NotImplementedError
+
+
+class MemoryGameCache(GameCache):
+    """
+    In-process cache, useful for a single long-running job. A copy sent to another process starts empty.
+    """
+
+    def __init__(self, live_ttl=60):
+        super().__init__(live_ttl)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'live_ttl': self.live_ttl}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _load(self, gamepk):
+        with self._lock:
+            return self._entries.get(gamepk)
+
+    def _store(self, gamepk, data, final, stored_at):
+        with self._lock:
+            self._entries[gamepk] = (data, final, stored_at)
+
+
+class FileGameCache(GameCache):
+    """
+    Stores each game as a gzip-compressed JSON file in `directory`.
+
+    Final games are written as `<gamePk>.final.json.gz`, in-progress games as
+    `<gamePk>.live.json.gz` and the file modification time is used as the
+    storage time.
+    """
+
+    def __init__(self, directory, live_ttl=60):
+        super().__init__(live_ttl)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, gamepk, final):
+        suffix = 'final' if final else 'live'
+        return os.path.join(self.directory, f"{gamepk}.{suffix}.json.gz")
+
+    def _load(self, gamepk):
+        for final in (True, False):
+            path = self._path(gamepk, final)
+            try:
+                stored_at = os.path.getmtime(path)
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    return json.load(f), final, stored_at
+            except (OSError, ValueError, EOFError):
+                continue
+        return None
+
+    def _store(self, gamepk, data, final, stored_at):
+        path = self._path(gamepk, final)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+        if final:
+            try:
+                os.remove(self._path(gamepk, False))
+            except OSError:
+                pass
+
+
+class SQLiteGameCache(GameCache):
+    """
+    Stores zlib-compressed JSON documents in a single SQLite database file.
+
+    A connection must not be shared between processes: a copy sent to another process, e.g. a worker
+    of `compute_season_zone_grids`, opens its own connection to the same file.
+    """
+
+    def __init__(self, path, live_ttl=60):
+        super().__init__(live_ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS play_by_play ('
+                'game_pk INTEGER PRIMARY KEY, final INTEGER NOT NULL, '
+                'stored_at REAL NOT NULL, data BLOB NOT NULL)'
+            )
+
+    def __getstate__(self):
+        return {'path': self.path, 'live_ttl': self.live_ttl}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _load(self, gamepk):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data, final, stored_at FROM play_by_play WHERE game_pk = ?', (gamepk,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        data, final, stored_at = row
+        return json.loads(zlib.decompress(data)), bool(final), stored_at
+
+    def _store(self, gamepk, data, final, stored_at):
+        blob = zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO play_by_play (game_pk, final, stored_at, data) VALUES (?, ?, ?, ?)',
+                (gamepk, int(final), stored_at, blob)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def estimate_size(value):
+    """
+    Rough size in bytes of a cached value: its `nbytes` when it has one, otherwise the
+    sizes of its containers and their items.
+    """
+    nbytes = getattr(value, 'nbytes', None)
+    if nbytes is not None:
+        return nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class _SizedLRU:
+    # Values with their estimated size and optional expiry, least recently used first. Not thread-safe.
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, _, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.drop(key)
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def put(self, key, value, size, ttl=None):
+        self.drop(key)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (value, size, None if ttl is None else time.monotonic() + ttl)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, dropped, _) = self.entries.popitem(last=False)
+            self.size -= dropped
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+class _Flight:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlightCache:
+    """
+    Thread-safe in-process layer that coalesces concurrent identical fetches.
+
+    While a key is being fetched, other callers asking for it wait for that fetch and share its
+    result, or its exception, instead of starting their own. Results are then kept in an LRU bounded
+    by their estimated size (see `estimate_size`); with `max_bytes` set to 0 nothing is kept and only
+    callers arriving during a fetch share it. Shared values must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes=256 * 2 ** 20):
+        self._lru = _SizedLRU(max_bytes)
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._lru.entries)
+
+    @property
+    def max_bytes(self):
+        return self._lru.max_bytes
+
+    @property
+    def size(self):
+        return self._lru.size
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+    def get(self, key, fetch, keep=True, ttl=None):
+        """
+        Return the value of `key`, calling `fetch()` only if it is neither kept nor being fetched.
+
+        Parameters:
+        - key: Hashable identifier of the request.
+        - fetch (callable): Produces the value.
+        - keep (bool): Whether to keep the fetched value for later calls. Default is True.
+        - ttl (float): Optional. Seconds the kept value stays valid. Defaults to no expiry.
+        """
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                count('cache_hits', source='single_flight')
+                return value
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            count('coalesced_requests')
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fetch()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            size = estimate_size(flight.value) if keep and self.max_bytes and flight.error is None else None
+            with self._lock:
+                del self._flights[key]
+                if size is not None:
+                    self._lru.put(key, flight.value, size, ttl)
+            flight.done.set()
+        return flight.value
+
+
+class RenderCache:
+    """
+    Thread-safe in-memory LRU of rendered images keyed by a digest of everything drawn, bounded by
+    the total size of the image bytes. Each image is kept with the batter name drawn in it, so a hit
+    needs no name lookup; lineup grids have no name.
+    """
+
+    def __init__(self, max_bytes=64 * 2 ** 20):
+        self._lru = _SizedLRU(max_bytes)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._lru.entries)
+
+    @property
+    def size(self):
+        return self._lru.size
+
+    def get(self, key):
+        """
+        Return the stored (batter name, image bytes) of a render key, or None on a miss.
+        """
+        with self._lock:
+            entry = self._lru.get(key)
+        count('cache_hits' if entry is not None else 'cache_misses', source='render')
+        return entry
+
+    def set(self, key, name, image):
+        with self._lock:
+            self._lru.put(key, (name, image), len(image))
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
@@ -1,80 +1,624 @@
 import datetime
-import mlbstatsapi
-import statsapi
+import logging
+import sys
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import pybaseball
 
-mlb = mlbstatsapi.Mlb()
+from .cache import FINAL_STATUSES
+from .cache import SingleFlightCache
+from .instrumentation import count, log, stage
+from .player_ids import lookup_player_names
+
+_mlb = None
+
+_game_cache = None
+
+_data_source = None
+
+_transport = None
+
+_participation_index = None
+
+# Only shares fetches between concurrent callers until a cache that keeps results is installed
+_single_flight_cache = SingleFlightCache(max_bytes=0)
+
+# Seconds a kept schedule stays valid, as game statuses change during the day
+SCHEDULE_TTL = 60
+
+# How lineup games are discovered, see `schedule_for_lineup`
+DISCOVERY_MODES = ('schedule', 'team')
+
+# Sorted search keys of (player, date) rows are player * KEY_SCALE + date ordinal, above any date.toordinal()
+KEY_SCALE = 1 << 22
+
+def parse_date(value):
+  """
+  Return a 'YYYY-MM-DD' string as a date; dates and None are returned as is.
+  """
+  return value if not isinstance(value, str) else datetime.strptime(value, "%Y-%m-%d").date()
+
+def get_mlb_client():
+  """
+  Return the shared `mlbstatsapi.Mlb` client, created on first use.
+  """
+  global _mlb
+  if _mlb is None:
+    import mlbstatsapi
+    _mlb = mlbstatsapi.Mlb()
+  return _mlb
+
+def __getattr__(name):
+  # `mlb` used to be built at import time; keep it reachable without paying for it upfront
+  if name == 'mlb':
+    return get_mlb_client()
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def set_game_cache(cache):
+  """
+  Install a play-by-play cache (see `baseball_analysis.cache`) used by every fetch
+  in the package. Pass None to disable caching.
+  """
+  global _game_cache
+  _game_cache = cache
+
+def get_game_cache():
+  return _game_cache
+
+def set_single_flight_cache(cache):
+  """
+  Install the `SingleFlightCache` play-by-play and schedule requests go through, e.g.
+  SingleFlightCache(max_bytes=512 * 2 ** 20) to also keep final games and schedules in memory.
+  Pass None to stop sharing requests between threads.
+  """
+  global _single_flight_cache
+  _single_flight_cache = cache
+
+def get_single_flight_cache():
+  return _single_flight_cache
+
+def set_data_source(source):
+  """
+  Install the source the lineup metric functions read pitches from: a `PitchStore`, a `StatcastSource`
+  or any object with their `lineup_table` method. Pass None to download games from the Stats API.
+  """
+  global _data_source
+  _data_source = source
+
+def get_data_source():
+  return _data_source
+
+def set_participation_index(index):
+  """
+  Install a `ParticipationIndex` the lineup functions look players' last games up in, instead of
+  scanning every game of the window. Each lookup first updates the index for its window, which only
+  downloads the games it has not scanned yet. Pass None to scan again.
+  """
+  global _participation_index
+  _participation_index = index
+
+def get_participation_index():
+  return _participation_index
+
+def set_transport(transport):
+  """
+  Install the object every Stats API request goes through: a `Transport` (by default one created on
+  first use) or anything with its `get(endpoint, params)` and `schedule(**params)` methods, such as
+  the `statsapi` module itself.
+  """
+  global _transport
+  _transport = transport
+
+def get_transport():
+  global _transport
+  if _transport is None:
+    from .transport import Transport
+    _transport = Transport()
+  return _transport
+
+def api_get(endpoint, params):
+  """
+  Send a Stats API request through the installed transport, reporting it and any error it raises.
+  """
+  count('http_requests', endpoint=endpoint)
+  try:
+    return get_transport().get(endpoint, params)
+  except Exception:
+    count('fetch_errors', endpoint=endpoint)
+    raise
+
+def api_schedule(**params):
+  """
+  Call `schedule` on the installed transport. Concurrent identical calls share one request.
+  """
+  def fetch():
+    count('http_requests', endpoint='schedule')
+    with stage('schedule'):
+      try:
+        return get_transport().schedule(**params)
+      except Exception:
+        count('fetch_errors', endpoint='schedule')
+        raise
+
+  shared = _single_flight_cache
+  if shared is None:
+    return fetch()
+  return shared.get(('schedule', tuple(sorted(params.items()))), fetch, ttl=SCHEDULE_TTL)
+
+class RateLimiter:
+  """
+  Thread-safe limiter that spaces out request starts to at most `requests_per_second`.
+  """
+
+  def __init__(self, requests_per_second):
+    self.interval = 1.0 / requests_per_second
+    self._next_slot = 0.0
+    self._lock = threading.Lock()
+
+  def wait(self):
+    with self._lock:
+      now = time.monotonic()
+      slot = max(now, self._next_slot)
+      self._next_slot = slot + self.interval
+    if slot > now:
+      time.sleep(slot - now)
+
+def fetch_play_by_play(gamepk, final=False, rate_limiter=None):
+  """
+  Fetch the play-by-play document of a game, going through the installed cache.
+
+  Parameters:
+  - gamepk (int): The unique identifier for the game.
+  - final (bool): Whether the game is known to be over. Final games are cached forever,
+    others only for the cache's live TTL.
+  - rate_limiter (RateLimiter, optional): Limiter consulted before each network request.
+  """
+  cache = _game_cache
+  if cache is not None:
+    data = cache.get(gamepk)
+    if data is not None:
+      count('cache_hits')
+      return data
+    count('cache_misses')
+
+  if rate_limiter is not None:
+    rate_limiter.wait()
+  with stage('play_by_play', gamepk=gamepk):
+    data = api_get('game_playByPlay', {'gamePk': gamepk})
+  if cache is not None:
+    cache.set(gamepk, data, final=final)
+  return data
+
+# Compact pitch record fields kept by `IndexedGame`: integer columns, float columns, then text columns
+# (`balls` and `strikes` are the count after the pitch, `balls_before` and `strikes_before` the count it was thrown in)
+PITCH_INT_FIELDS = ('pitcher', 'zone', 'balls', 'strikes', 'balls_before', 'strikes_before',
+                    'is_in_play', 'is_out', 'is_at_bat', 'is_sac_fly')
+# Plate location in feet, from the catcher's view: horizontal from the middle of the plate and height
+PITCH_FLOAT_FIELDS = ('px', 'pz')
+PITCH_TEXT_FIELDS = ('call_code', 'call_description', 'description', 'event', 'pitch_hand', 'pitch_type')
+
+# array typecode of each integer field; missing zones and counts are stored as -1 and missing locations as NaN
+PITCH_INT_TYPECODES = {'pitcher': 'q', 'zone': 'b', 'balls': 'b', 'strikes': 'b', 'balls_before': 'b',
+                       'strikes_before': 'b', 'is_in_play': 'b', 'is_out': 'b', 'is_at_bat': 'b', 'is_sac_fly': 'b'}
+NAN = float('nan')
+
+class IndexedGame:
+  """
+  The pitches of a game in compact columnar form, grouped by batter.
+
+  Only the fields the zone metrics read are kept: integer fields in typed arrays and text fields in
+  tuples of interned strings, so the play-by-play document can be dropped as soon as it is extracted.
+  `rows_by_batter` maps every batter id with a play to the (start, stop) rows of their pitches, in
+  play order. `plays_without_events` counts the plays of each batter that come without `playEvents`.
+  """
+  __slots__ = ('gamepk', 'has_plays', 'rows_by_batter', 'plays_without_events', 'columns')
+
+  def __init__(self, gamepk, data):
+    self.gamepk = gamepk
+    self.has_plays = 'allPlays' in data
+    self.rows_by_batter, self.plays_without_events, self.columns = extract_game_pitches(data)
+
+  def __len__(self):
+    return len(self.columns['pitcher'])
+
+  @property
+  def nbytes(self):
+    """
+    Approximate memory held by the columns and the batter index; text values are interned and not counted.
+    """
+    size = sum(column.itemsize * len(column) if isinstance(column, array) else 8 * len(column)
+               for column in self.columns.values())
+    return size + 200 * len(self.rows_by_batter)
+
+  def batter_rows(self, batter_id):
+    """
+    Return the (start, stop) rows of a batter's pitches, (0, 0) if the batter did not play.
+    """
+    return self.rows_by_batter.get(batter_id, (0, 0))
+
+def _pitch_record(play, event, balls_before, strikes_before):
+  details = event.get('details', {})
+  call = details.get('call', {})
+  count = event.get('count', {})
+  pitch_data = event.get('pitchData', {})
+  zone = pitch_data.get('zone')
+  coordinates = pitch_data.get('coordinates', {})
+  result = play.get('result', {})
+  event_name = result.get('event')
+  is_sac_fly = event_name == 'Flyout' and 'runner' in details and event['result']['rbi'] > 0
+
+  return (
+    play['matchup'].get('pitcher', {}).get('id', -1),
+    -1 if zone is None else zone,
+    count.get('balls', -1),
+    count.get('strikes', -1),
+    balls_before,
+    strikes_before,
+    bool(details.get('isInPlay')),
+    bool(details.get('isOut')),
+    result.get('type') == 'atBat',
+    is_sac_fly,
+    _location(coordinates.get('pX')),
+    _location(coordinates.get('pZ')),
+    call.get('code'),
+    call.get('description'),
+    details.get('description'),
+    event_name,
+    play['matchup'].get('pitchHand', {}).get('code'),
+    details.get('type', {}).get('code'),
+  )
+
+def _location(value):
+  return NAN if value is None else float(value)
+
+def _play_records(play, events):
+  # Every pitch is thrown in the count left by the previous pitch of the plate appearance
+  records = []
+  balls_before, strikes_before = 0, 0
+  for event in events:
+    if event.get('isPitch'):
+      record = _pitch_record(play, event, balls_before, strikes_before)
+      records.append(record)
+      balls_before, strikes_before = record[2], record[3]
+  return records
+
+def _intern(value):
+  return sys.intern(value) if isinstance(value, str) else value
+
+def extract_game_pitches(game_data):
+  """
+  Extract the compact pitch records of a play-by-play document.
+
+  Returns:
+  - tuple: ({batter_id: (start, stop)}, {batter_id: plays without events}, {field: column}) with the
+    columns of `PITCH_INT_FIELDS` and `PITCH_FLOAT_FIELDS` as arrays and those of `PITCH_TEXT_FIELDS` as tuples.
+  """
+  records_by_batter = {}
+  plays_without_events = {}
+  for play in game_data.get('allPlays', []):
+    batter_id = play['matchup']['batter']['id']
+    records = records_by_batter.setdefault(batter_id, [])
+    events = play.get('playEvents')
+    if events is None:
+      plays_without_events[batter_id] = plays_without_events.get(batter_id, 0) + 1
+      continue
+    records.extend(_play_records(play, events))
+
+  rows_by_batter = {}
+  records = []
+  for batter_id, batter_records in records_by_batter.items():
+    rows_by_batter[batter_id] = (len(records), len(records) + len(batter_records))
+    records.extend(batter_records)
+
+  fields = dict(zip(PITCH_INT_FIELDS + PITCH_FLOAT_FIELDS + PITCH_TEXT_FIELDS, zip(*records)))
+  columns = {}
+  for field in PITCH_INT_FIELDS:
+    columns[field] = array(PITCH_INT_TYPECODES[field], fields.get(field, ()))
+  for field in PITCH_FLOAT_FIELDS:
+    columns[field] = array('d', fields.get(field, ()))
+  for field in PITCH_TEXT_FIELDS:
+    columns[field] = tuple(_intern(value) for value in fields.get(field, ()))
+  return rows_by_batter, plays_without_events, columns
+
+class GameFetchError(Exception):
+  """
+  Raised when the play-by-play of games cannot be downloaded, once the transport gave up retrying.
+  Results are not computed without them, as leaving games out would skew the zone rates.
+  `gamepks` lists the games and `cause` describes the last error.
+  """
+
+  def __init__(self, gamepks, cause=''):
+    super().__init__(list(gamepks), str(cause))
+    self.gamepks, self.cause = self.args
+
+  def __str__(self):
+    return f"Could not fetch game(s) {', '.join(str(gamepk) for gamepk in self.gamepks)}: {self.cause}"
+
+def load_indexed_game(gamepk, final=False, rate_limiter=None):
+  """
+  Fetch a game and keep only its compact pitch records; the document itself is not retained.
+
+  Concurrent loads of the same game share one download, see `set_single_flight_cache`.
+
+  Raises:
+  - GameFetchError: If the game cannot be downloaded.
+  """
+  def load():
+    try:
+      data = fetch_play_by_play(gamepk, final=final, rate_limiter=rate_limiter)
+    except Exception as e:
+      raise GameFetchError([gamepk], e) from e
+    with stage('index'):
+      return IndexedGame(gamepk, data)
+
+  shared = _single_flight_cache
+  if shared is None:
+    return load()
+  # Games in progress are only shared with concurrent callers, never kept
+  return shared.get(('game', int(gamepk)), load, keep=final)
+
+def fetch_scheduled_games(games, max_workers=1, requests_per_second=None):
+  """
+  Fetch the play-by-play of every game returned by `statsapi.schedule`.
+
+  Yields (game, IndexedGame) pairs in schedule order. With `max_workers` > 1 the documents are
+  downloaded and indexed by a bounded thread pool, optionally throttled to `requests_per_second`.
+  """
+  rate_limiter = RateLimiter(requests_per_second) if requests_per_second else None
+
+  def fetch(game):
+    final = game.get('status') in FINAL_STATUSES
+    return load_indexed_game(game['game_id'], final=final, rate_limiter=rate_limiter)
+
+  if max_workers <= 1:
+    for game in games:
+      yield game, fetch(game)
+    return
+
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    yield from zip(games, executor.map(fetch, games))
+
+def fetch_final_games(gamepks, max_workers=1, requests_per_second=None):
+  """
+  Fetch the play-by-play of final games by gamePk, like `fetch_scheduled_games`.
+
+  Yields (gamepk, IndexedGame) pairs in the given order.
+  """
+  rate_limiter = RateLimiter(requests_per_second) if requests_per_second else None
+
+  def fetch(gamepk):
+    return load_indexed_game(gamepk, final=True, rate_limiter=rate_limiter)
+
+  if max_workers <= 1:
+    for gamepk in gamepks:
+      yield gamepk, fetch(gamepk)
+    return
+
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    yield from zip(gamepks, executor.map(fetch, gamepks))
+
+def batting_order_from_feed(feed, team='away'):
+  """
+  Return the batting order of 'home' or 'away' from a live game feed (the `game` endpoint).
+  """
+  return feed['liveData']['boxscore']['teams'][team]['battingOrder']
 
 def convert_id_to_mlb_id(player_data):
+  with stage('id_resolution'):
+    names = lookup_player_names(player_data)
   converted_data = {}
   for player_id, metrics in player_data.items():
-    name_info = pybaseball.playerid_reverse_lookup(player_ids=[player_id], key_type='mlbam')
-    if not name_info.empty:
-      first_name = name_info['name_first'].iloc[0].capitalize()
-      last_name = name_info['name_last'].iloc[0].capitalize()
-      full_name = f"{first_name} {last_name}"
-      converted_data[full_name] = metrics
+    if player_id in names:
+      converted_data[names[player_id]] = metrics
   return converted_data
 
-def get_last_n_gamepks_of_lineup(lineup_ids, last_n_days=10, from_date=None, last_n_pks=5):
-  last_n_gamepks_dict = {player_id: [] for player_id in lineup_ids}
+def resolve_player_teams(player_ids, start_date, end_date=None):
+  """
+  Find every team each player belonged to from `start_date` on.
+
+  The current team comes from the people endpoint and any team involved in one of the player's
+  transactions since `start_date` (trades, options, signings) is added, so players moved during
+  the window keep all their teams.
+
+  Parameters:
+  - player_ids (list): MLB player IDs.
+  - start_date (str): First date of the window in 'YYYY-MM-DD' format.
+  - end_date (str): Optional. Last date to look for transactions. Defaults to today.
+
+  Returns:
+  - dict: {player_id: set of team IDs}
+  """
+  if end_date is None:
+    end_date = datetime.now().date().strftime("%Y-%m-%d")
+
+  player_teams = {player_id: set() for player_id in player_ids}
+  if not player_teams:
+    return player_teams
+
+  people = api_get('people', {'personIds': ','.join(str(player_id) for player_id in player_teams),
+                                   'hydrate': 'currentTeam'})
+  for person in people.get('people', []):
+    team_id = person.get('currentTeam', {}).get('id')
+    if team_id and person['id'] in player_teams:
+      player_teams[person['id']].add(team_id)
+
+  for player_id in player_teams:
+    transactions = api_get('transactions', {'playerId': player_id, 'startDate': start_date, 'endDate': end_date})
+    for transaction in transactions.get('transactions', []):
+      for side in ('fromTeam', 'toTeam'):
+        team_id = transaction.get(side, {}).get('id')
+        if team_id:
+          player_teams[player_id].add(team_id)
+
+  return player_teams
 
+def schedule_for_teams(team_ids, start_date, end_date):
+  """
+  Combine the schedules of several teams, without duplicates and in chronological order.
+  """
+  games = {}
+  for team_id in sorted(team_ids):
+    for game in api_schedule(start_date=start_date, end_date=end_date, team=team_id):
+      games.setdefault(game['game_id'], game)
+  return sorted(games.values(), key=lambda game: (game.get('game_date', ''), game.get('game_datetime', ''), game['game_id']))
+
+def _check_discovery(discovery):
+  if discovery not in DISCOVERY_MODES:
+    raise ValueError(f"discovery should be one of {DISCOVERY_MODES}.")
+
+def schedule_for_lineup(lineup_ids, start_date, end_date, discovery='schedule'):
+  """
+  Return the scheduled games that may involve the lineup.
+
+  With discovery='schedule' this is the league-wide schedule of the window. With discovery='team'
+  only the schedules of the players' teams are queried; the league-wide schedule is used as a
+  fallback when a player's team cannot be resolved.
+  """
+  _check_discovery(discovery)
+
+  if discovery == 'team':
+    try:
+      with stage('team_resolution'):
+        player_teams = resolve_player_teams(lineup_ids, start_date)
+      if all(player_teams.values()):
+        team_ids = set().union(*player_teams.values())
+        return schedule_for_teams(team_ids, start_date, end_date)
+      log(logging.WARNING, 'team_resolution',
+          "Could not resolve the team of every player, using the league-wide schedule")
+    except Exception as e:
+      log(logging.ERROR, 'discovery', "Error in schedule_for_lineup: %s", e, discovery=discovery)
+
+  return api_schedule(start_date=start_date, end_date=end_date)
+
+def add_new_final_games(add_games, held, start_date, end_date, max_workers=1, requests_per_second=None,
+                        lineup_ids=(), discovery='schedule'):
+  """
+  Download the final games scheduled between two dates (both included) that are not in `held` and
+  pass them to `add_games(games, game_dates)`, like `GameZonePartials.add_games` and
+  `ParticipationIndex.add_games`, with `game_dates` mapping each gamePk to its date.
+
+  Games still in progress are left out, as they would change. `lineup_ids` and `discovery` select the
+  schedule, see `schedule_for_lineup`. A fetch error is raised once the games downloaded so far are
+  added, so the next call resumes where this one stopped.
+
+  Returns:
+  - The value returned by `add_games`.
+  """
+  start_date = parse_date(start_date).strftime("%Y-%m-%d")
+  end_date = parse_date(end_date).strftime("%Y-%m-%d")
+
+  games = []
+  game_dates = {}
   try:
-    if from_date is None:
-      from_date = datetime.now().date()
-    else:
-      from_date = datetime.strptime(from_date, "%Y-%m-%d").date()
+    scheduled = [game for game in schedule_for_lineup(lineup_ids, start_date, end_date, discovery)
+                 if game.get('status') in FINAL_STATUSES and game['game_id'] not in held]
+    for game, indexed_game in fetch_scheduled_games(scheduled, max_workers, requests_per_second):
+      games.append(indexed_game)
+      game_dates[game['game_id']] = game['game_date']
+  except Exception:
+    add_games(games, game_dates)
+    raise
+  return add_games(games, game_dates)
+
+def find_lineup_games(lineup_ids, last_n_days=10, from_date=None, last_n_pks=5,
+                      max_workers=1, requests_per_second=None, discovery='schedule'):
+  """
+  Find the last games of each lineup player and keep the loaded games they point to.
+
+  `discovery` selects how candidate games are found, see `schedule_for_lineup`. With a participation
+  index installed (see `set_participation_index`) the index is updated for the window and the games
+  are looked up in it instead; only the games found that the update did not just download are fetched.
+
+  Returns:
+  - tuple: ({player_id: [gamepk, ...]}, {gamepk: IndexedGame}) where the second mapping only holds
+    the games referenced by the first one.
+
+  Raises:
+  - GameFetchError: If a game of the window cannot be downloaded.
+  """
+  _check_discovery(discovery)
+  last_n_gamepks_dict = {player_id: [] for player_id in lineup_ids}
+  loaded_games = {}
+
+  with stage('discovery', discovery=discovery):
+    from_date = datetime.now().date() if from_date is None else parse_date(from_date)
 
     start_date = from_date - timedelta(days=last_n_days)
     end_date = from_date - timedelta(days=1)
 
-    games = statsapi.schedule(start_date=start_date.strftime("%Y-%m-%d"), end_date=end_date.strftime("%Y-%m-%d"))
-    for game in games:
-      game_pk = game['game_id']
-      game_data = statsapi.get('game_playByPlay', {'gamePk': game_pk})
+    index = _participation_index
+    if index is not None:
+      index.update(start_date, end_date, max_workers, requests_per_second, downloaded=loaded_games)
+      last_n_gamepks_dict = index.last_games(lineup_ids, last_n_pks, start_date, end_date)
+      gamepks = list(dict.fromkeys(gamepk for gamepks in last_n_gamepks_dict.values() for gamepk in gamepks
+                                   if gamepk not in loaded_games))
+      for game_pk, indexed_game in fetch_final_games(gamepks, max_workers, requests_per_second):
+        count('games_scanned', stage='discovery')
+        loaded_games[game_pk] = indexed_game
+    else:
+      games = schedule_for_lineup(lineup_ids, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"),
+                                  discovery)
+      for game, indexed_game in fetch_scheduled_games(games, max_workers, requests_per_second):
+        game_pk = game['game_id']
+        count('games_scanned', stage='discovery')
+
+        for player_id in lineup_ids:
+          if player_id in indexed_game.rows_by_batter:
+            last_n_gamepks_dict[player_id].append(game_pk)
+            last_n_gamepks_dict[player_id] = last_n_gamepks_dict[player_id][-last_n_days:]
+            loaded_games[game_pk] = indexed_game
 
-      for player_id in lineup_ids:
-        player_participated = any(
-          play['matchup']['batter']['id'] == player_id for play in game_data['allPlays']
-                )
-        if player_participated:
-          last_n_gamepks_dict[player_id].append(game_pk)
-          last_n_gamepks_dict[player_id] = last_n_gamepks_dict[player_id][-last_n_days:]
+        for player_id, gamepks in last_n_gamepks_dict.items():
+          last_n_gamepks_dict[player_id] = gamepks[-last_n_pks:]
 
-      for player_id, gamepks in last_n_gamepks_dict.items():
-        last_n_gamepks_dict[player_id] = gamepks[-last_n_pks:]
+  needed = {gamepk for gamepks in last_n_gamepks_dict.values() for gamepk in gamepks}
+  return last_n_gamepks_dict, {gamepk: game for gamepk, game in loaded_games.items() if gamepk in needed}
 
-  except Exception as e:
-    print(f"Error in get_last_n_gamepks_of_lineup: {e}")
+def get_last_n_gamepks_of_lineup(lineup_ids, last_n_days=10, from_date=None, last_n_pks=5,
+                                 max_workers=1, requests_per_second=None, discovery='schedule'):
+  index = _participation_index
+  if index is not None:
+    # Only the gamePks are needed, so once the index is up to date no game has to be kept
+    _check_discovery(discovery)
+    from_date = datetime.now().date() if from_date is None else parse_date(from_date)
+    start_date = from_date - timedelta(days=last_n_days)
+    end_date = from_date - timedelta(days=1)
+    with stage('discovery', discovery='index'):
+      index.update(start_date, end_date, max_workers, requests_per_second)
+      return index.last_games(lineup_ids, last_n_pks, start_date, end_date)
 
+  last_n_gamepks_dict, _ = find_lineup_games(lineup_ids, last_n_days, from_date, last_n_pks,
+                                             max_workers, requests_per_second, discovery)
   return last_n_gamepks_dict
 
-def remap_zone_for_pitchers_pov(data):
-  # Define the mapping from catcher's zones to pitcher's zones
-  zone_mapping = {
-      1: 3, 2: 2, 3: 1, 4: 6, 5: 5, 6: 4, 7: 9, 8: 8, 9: 7, 11: 12, 12: 11, 13: 14, 14: 13
-  }
+# Mapping from catcher's zones to pitcher's zones
+PITCHERS_POV_ZONES = {
+    1: 3, 2: 2, 3: 1, 4: 6, 5: 5, 6: 4, 7: 9, 8: 8, 9: 7, 11: 12, 12: 11, 13: 14, 14: 13
+}
 
+# Position of each zone number on the strike zone plot
+ZONE_NUMBER_COORDINATES = {
+    1: (3, 3), 2: (5, 3), 3: (7, 3), 4: (3, 1), 5: (5, 1), 6: (7, 1), 7: (3, -1),
+    8: (5, -1),9: (7, -1), 11: (1, 5), 12: (9, 5), 13: (1, -3), 14: (9, -3)
+}
+
+def remap_zone_for_pitchers_pov(data):
   remapped_data = {}
 
   # Remap the data
   for batter_id, zone_data in data.items():
-    remapped_zone_data = {zone_mapping[zone]: value for zone, value in zone_data.items()}
+    remapped_zone_data = {PITCHERS_POV_ZONES[zone]: value for zone, value in zone_data.items()}
     remapped_data[batter_id] = remapped_zone_data
 
   return remapped_data
 
 def remap_zone_number_to_coordinates(data):
-  mapping = {
-      1: (3, 3), 2: (5, 3), 3: (7, 3), 4: (3, 1), 5: (5, 1), 6: (7, 1), 7: (3, -1),
-      8: (5, -1),9: (7, -1), 11: (1, 5), 12: (9, 5), 13: (1, -3), 14: (9, -3)
-  }
-
   remapped_data = {}
 
   for batter_id, zone_data in data.items():
-    remapped_zone_data = {mapping[zone]: value for zone, value in zone_data.items()}
+    remapped_zone_data = {ZONE_NUMBER_COORDINATES[zone]: value for zone, value in zone_data.items()}
     remapped_data[batter_id] = remapped_zone_data
 
   return remapped_data
@@ -0,0 +1,199 @@
+"""
+Zone metrics on a fine grid of plate locations instead of the 13 Stats API zones.
+
+Pitches are binned by their pX/pZ coordinates with one vectorized bincount per pitch flag covering
+every player at once. Optional Gaussian smoothing is applied to numerators and denominators separately
+before the rates are derived.
+"""
+import numpy as np
+
+from .pitch_table import pitch_flags
+from .zone_engine import ZONE_METRICS
+from .zone_engine import VIEWS
+from .zone_engine import _validate_metrics
+from .zone_engine import load_lineup_window
+from .zone_engine import metric_flags
+
+# Default plotted area in feet: a little wider than the plate and from the ground to above the shoulders
+X_RANGE = (-2.0, 2.0)
+Z_RANGE = (0.0, 5.0)
+
+
+def _gaussian_kernel(sigma):
+    radius = max(1, int(round(3 * sigma)))
+    offsets = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+    return kernel / kernel.sum()
+
+
+def smooth(grids, sigma):
+    """
+    Blur (players, x bins, z bins) arrays with a separable Gaussian kernel of `sigma` bins.
+    Mass is kept inside the grid by mirroring it at the edges.
+    """
+    if not sigma:
+        return grids.astype(np.float64)
+
+    kernel = _gaussian_kernel(sigma)
+    radius = len(kernel) // 2
+    smoothed = grids.astype(np.float64)
+    for axis in (1, 2):
+        pad = [(0, 0)] * smoothed.ndim
+        pad[axis] = (radius, radius)
+        padded = np.pad(smoothed, pad, mode='symmetric')
+        windows = np.lib.stride_tricks.sliding_window_view(padded, len(kernel), axis=axis)
+        smoothed = windows @ kernel
+    return smoothed
+
+
+class LocationGrid:
+    """
+    One zone metric on a grid of plate locations for several players.
+
+    `numerators` and `denominators` are float arrays of shape (players, len(x_edges) - 1, len(z_edges) - 1),
+    integral unless smoothed. `x_edges` run left to right as seen from `view`.
+    """
+    __slots__ = ('metric', 'player_ids', 'x_edges', 'z_edges', 'numerators', 'denominators', 'view')
+
+    def __init__(self, metric, player_ids, x_edges, z_edges, numerators, denominators, view='catcher'):
+        if view not in VIEWS:
+            raise ValueError(f"view should be one of {VIEWS}.")
+        self.metric = metric
+        self.player_ids = tuple(player_ids)
+        self.x_edges = np.asarray(x_edges, dtype=np.float64)
+        self.z_edges = np.asarray(z_edges, dtype=np.float64)
+        self.numerators = np.asarray(numerators, dtype=np.float64)
+        self.denominators = np.asarray(denominators, dtype=np.float64)
+        self.view = view
+
+    def __repr__(self):
+        return (f"LocationGrid({self.metric!r}, players={len(self.player_ids)}, "
+                f"bins={self.numerators.shape[1:]}, view={self.view!r})")
+
+    def values(self, min_denominator=1e-9):
+        """
+        Return the rate of every cell as an array of shape (players, x bins, z bins), NaN where the
+        denominator is below `min_denominator`.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = self.numerators / self.denominators
+        values[self.denominators < min_denominator] = np.nan
+        return values
+
+    def to_view(self, view):
+        """
+        Return the grid as seen by the catcher or the pitcher; the pitcher's view mirrors the x axis.
+        """
+        if view not in VIEWS:
+            raise ValueError(f"view should be one of {VIEWS}.")
+        if view == self.view:
+            return self
+        return LocationGrid(self.metric, self.player_ids, -self.x_edges[::-1], self.z_edges,
+                            self.numerators[:, ::-1], self.denominators[:, ::-1], view)
+
+    def to_plot_data(self, min_denominator=1e-9):
+        """
+        Return {player_id: (values, x_edges, z_edges)} in the pitcher's view, as expected by
+        `render_location_heatmaps`.
+        """
+        grid = self.to_view('pitcher')
+        values = grid.values(min_denominator)
+        return {player_id: (values[row], grid.x_edges, grid.z_edges) for row, player_id in enumerate(grid.player_ids)}
+
+
+def location_bincount(table, player_ids, weights, x_edges, z_edges):
+    """
+    Sum `weights` per (player, x bin, z bin) with a single bincount.
+
+    Pitches of other batters, without a location or outside the edges are ignored.
+
+    Returns:
+    - numpy.ndarray: Integer array of shape (len(player_ids), len(x_edges) - 1, len(z_edges) - 1).
+    """
+    player_ids = np.asarray(player_ids, dtype=np.int64)
+    x_bins = len(x_edges) - 1
+    z_bins = len(z_edges) - 1
+    if len(player_ids) == 0 or len(table) == 0:
+        return np.zeros((len(player_ids), x_bins, z_bins), dtype=np.int64)
+
+    order = np.argsort(player_ids, kind='stable')
+    sorted_ids = player_ids[order]
+    batters = table['batter'].to_numpy()
+    px = table['px'].to_numpy()
+    pz = table['pz'].to_numpy()
+
+    positions = np.clip(np.searchsorted(sorted_ids, batters), 0, len(sorted_ids) - 1)
+    # searchsorted on the edges is what np.histogram2d does per call, here done for every player at once
+    x_index = np.searchsorted(x_edges, px, side='right') - 1
+    z_index = np.searchsorted(z_edges, pz, side='right') - 1
+    # Like np.histogram, the last bin includes its right edge
+    x_index[px == x_edges[-1]] = x_bins - 1
+    z_index[pz == z_edges[-1]] = z_bins - 1
+    valid = ((sorted_ids[positions] == batters) & (x_index >= 0) & (x_index < x_bins)
+             & (z_index >= 0) & (z_index < z_bins))
+
+    keys = (order[positions[valid]] * x_bins + x_index[valid]) * z_bins + z_index[valid]
+    sums = np.bincount(keys, weights=np.asarray(weights)[valid], minlength=len(player_ids) * x_bins * z_bins)
+    return sums.reshape(len(player_ids), x_bins, z_bins).round().astype(np.int64)
+
+
+def _edges(bins, x_range, z_range):
+    x_bins, z_bins = (bins, bins) if np.isscalar(bins) else bins
+    return np.linspace(*x_range, int(x_bins) + 1), np.linspace(*z_range, int(z_bins) + 1)
+
+
+def location_grids_from_table(table, player_ids, metrics=None, bins=(20, 25), x_range=X_RANGE, z_range=Z_RANGE,
+                              smoothing=0, view='catcher'):
+    """
+    Compute a LocationGrid per requested metric from a pitch table (see `build_pitch_table`).
+
+    Every metric is computed over the whole grid, including called strike rate outside the strike zone.
+
+    Returns:
+    - dict: {metric: LocationGrid}
+    """
+    metrics = _validate_metrics(metrics)
+    if view not in VIEWS:
+        raise ValueError(f"view should be one of {VIEWS}.")
+    player_ids = list(player_ids)
+    x_edges, z_edges = _edges(bins, x_range, z_range)
+
+    table_flags = pitch_flags(table)
+    grids = {flag: location_bincount(table, player_ids, table_flags[flag], x_edges, z_edges)
+             for flag in metric_flags(metrics)}
+
+    location_grids = {}
+    for metric in metrics:
+        spec = ZONE_METRICS[metric]
+        numerators = sum(grids[spec['fields'][field]] for field in spec['numerator'])
+        denominators = sum(grids[spec['fields'][field]] for field in spec['denominator'])
+        location_grids[metric] = LocationGrid(metric, player_ids, x_edges, z_edges, smooth(numerators, smoothing),
+                                              smooth(denominators, smoothing)).to_view(view)
+    return location_grids
+
+
+def compute_location_grids(lineup_ids, metrics=None, bins=(20, 25), x_range=X_RANGE, z_range=Z_RANGE, smoothing=0,
+                           last_n_days=10, from_date=None, last_n_pks=5, max_workers=1, requests_per_second=None,
+                           discovery='schedule', view='catcher'):
+    """
+    Calculate zone metrics for a lineup on a fine grid of plate locations.
+
+    Takes the parameters of `compute_zone_grids`, plus:
+    - bins (int or tuple): Number of bins across and up the plate, or one number for both. Default is (20, 25).
+    - x_range (tuple): Horizontal extent of the grid in feet from the middle of the plate. Default is (-2, 2).
+    - z_range (tuple): Vertical extent of the grid in feet above the ground. Default is (0, 5).
+    - smoothing (float): Standard deviation in bins of the Gaussian blur applied to the counts. Default is 0 (none).
+
+    Returns:
+    - dict: {metric: LocationGrid}
+
+    Raises:
+    - ValueError: If an unknown metric, discovery mode or view is requested.
+    """
+    metrics = _validate_metrics(metrics)
+    if view not in VIEWS:
+        raise ValueError(f"view should be one of {VIEWS}.")
+
+    player_ids, table = load_lineup_window(lineup_ids, last_n_days, from_date, last_n_pks,
+                                           max_workers, requests_per_second, discovery)
+    return location_grids_from_table(table, player_ids, metrics, bins, x_range, z_range, smoothing, view)
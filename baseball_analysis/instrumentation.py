@@ -0,0 +1,162 @@
+"""
+Timers and counters for the lineup pipeline.
+
+The pipeline reports two kinds of events to every registered hook and, at DEBUG level, to the
+'baseball_analysis' logger (the event dict is attached to the record as `baseball_analysis`):
+
+- {'kind': 'stage', 'name': ..., 'value': seconds, ...tags} for the stages 'schedule', 'team_resolution',
+  'discovery', 'play_by_play', 'decode', 'index', 'event_scan', 'aggregate', 'id_resolution', 'render',
+  'season', 'live_poll', 'store_read', 'statcast', 'slate' and 'participation'.
+- {'kind': 'counter', 'name': ..., 'value': amount, ...tags} for 'http_requests', 'http_bytes',
+  'cache_hits', 'cache_misses', 'games_scanned', 'events_scanned', 'fetch_errors', 'http_retries',
+  'http_not_modified' and 'coalesced_requests'.
+
+When no hook is registered and DEBUG logging is off, timers and counters cost next to nothing.
+
+Skipped games, fallbacks and other recoverable errors are logged to the same logger at WARNING or
+ERROR level with `log`, with the stage and fields such as `gamepk` attached as `baseball_analysis`.
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+logger = logging.getLogger('baseball_analysis')
+
+_hooks = []
+
+# While set, events are appended to this list instead of being reported, see `record_events`
+_recorded = None
+
+
+def add_hook(hook):
+    """
+    Register a callable receiving every stage and counter event as a dict.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+def enabled():
+    """
+    Whether anybody listens to pipeline events.
+    """
+    return _recorded is not None or bool(_hooks) or logger.isEnabledFor(logging.DEBUG)
+
+
+def emit(kind, name, value, **tags):
+    event = {'kind': kind, 'name': name, 'value': value}
+    event.update(tags)
+    if _recorded is not None:
+        _recorded.append(event)
+        return
+    for hook in list(_hooks):
+        hook(event)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('%s %s=%s', kind, name, value, extra={'baseball_analysis': event})
+
+
+def log(level, stage_name, message, *args, **fields):
+    """
+    Log a message of a pipeline stage, with {'stage': stage_name, **fields} attached to the record as
+    `baseball_analysis`.
+    """
+    fields['stage'] = stage_name
+    logger.log(level, message, *args, extra={'baseball_analysis': fields})
+
+
+def count(name, value=1, **tags):
+    if enabled():
+        emit('counter', name, value, **tags)
+
+
+@contextmanager
+def stage(name, **tags):
+    """
+    Time the enclosed block and report it as a stage event, even when it raises.
+    """
+    if not enabled():
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        emit('stage', name, time.perf_counter() - start, **tags)
+
+
+@contextmanager
+def record_events():
+    """
+    Record the events emitted inside the block in a list instead of reporting them.
+
+    Used in worker processes, whose hooks are copies of the parent's or missing: the worker returns
+    the list and the parent passes it to `report_events`.
+    """
+    global _recorded
+    previous, _recorded = _recorded, []
+    try:
+        yield _recorded
+    finally:
+        _recorded = previous
+
+
+def report_events(events):
+    """
+    Report events recorded by `record_events` to the hooks and logger of this process.
+    """
+    for event in events:
+        tags = dict(event)
+        emit(tags.pop('kind'), tags.pop('name'), tags.pop('value'), **tags)
+
+
+class PipelineStats:
+    """
+    Hook that aggregates events: total seconds and calls per stage, totals per counter.
+    """
+
+    def __init__(self):
+        self.stage_seconds = defaultdict(float)
+        self.stage_calls = Counter()
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            if event['kind'] == 'stage':
+                self.stage_seconds[event['name']] += event['value']
+                self.stage_calls[event['name']] += 1
+            else:
+                self.counters[event['name']] += event['value']
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'stages': {name: {'seconds': seconds, 'calls': self.stage_calls[name]}
+                           for name, seconds in self.stage_seconds.items()},
+                'counters': dict(self.counters),
+            }
+
+
+@contextmanager
+def collect_stats():
+    """
+    Collect the pipeline events emitted inside the block.
+
+    Example:
+    >>> with collect_stats() as stats:
+    ...     compute_zone_metrics(lineup)
+    >>> stats.as_dict()['counters']['http_requests']
+    """
+    stats = PipelineStats()
+    add_hook(stats)
+    try:
+        yield stats
+    finally:
+        remove_hook(stats)
@@ -0,0 +1,256 @@
+"""
+Incremental zone counters for games in progress.
+
+A `LiveZoneTracker` keeps the live feed of one game. The first poll downloads the full feed. Later
+polls ask `game_timestamps` whether anything changed and only download the diffPatch between the
+last seen timecode and the latest one. Plays are counted once, when they complete, into a mergeable
+`ZonePartial` holding every batter of the game, so substitutes are covered as well.
+"""
+import asyncio
+import copy
+import logging
+
+from .data_fetch import IndexedGame
+from .data_fetch import api_get
+from .data_fetch import batting_order_from_feed
+from .instrumentation import count
+from .instrumentation import log
+from .instrumentation import stage
+from .pitch_table import build_pitch_table
+from .season import ZonePartial
+from .zone_engine import VIEWS
+from .zone_engine import _validate_metrics
+from .zone_engine import metric_flags
+from .zone_engine import zone_grids_from_field_grids
+
+
+def _pointer(path):
+    return [part.replace('~1', '/').replace('~0', '~') for part in path.split('/')[1:]]
+
+
+def _parent(document, parts):
+    target = document
+    for part in parts[:-1]:
+        target = target[int(part)] if isinstance(target, list) else target[part]
+    return target, parts[-1]
+
+
+def _add(document, path, value):
+    parts = _pointer(path)
+    if not parts:
+        return value
+    parent, key = _parent(document, parts)
+    if isinstance(parent, list):
+        if key == '-':
+            parent.append(value)
+        else:
+            parent.insert(int(key), value)
+    else:
+        parent[key] = value
+    return document
+
+
+def _remove(document, path):
+    parent, key = _parent(document, _pointer(path))
+    if isinstance(parent, list):
+        return parent.pop(int(key))
+    return parent.pop(key)
+
+
+def _value(document, path):
+    parts = _pointer(path)
+    if not parts:
+        return document
+    parent, key = _parent(document, parts)
+    return parent[int(key)] if isinstance(parent, list) else parent[key]
+
+
+def apply_json_patch(document, operations):
+    """
+    Apply JSON Patch (RFC 6902) operations, as returned by the diffPatch endpoint, in place.
+
+    Returns:
+    - The patched document, which is a new object when the whole document is replaced.
+
+    Raises:
+    - ValueError: If an operation is unknown or a 'test' operation fails.
+    """
+    for operation in operations:
+        op = operation['op']
+        path = operation['path']
+        if op == 'add':
+            document = _add(document, path, operation['value'])
+        elif op == 'remove':
+            _remove(document, path)
+        elif op == 'replace':
+            if not _pointer(path):
+                document = operation['value']
+            else:
+                parent, key = _parent(document, _pointer(path))
+                parent[int(key) if isinstance(parent, list) else key] = operation['value']
+        elif op == 'move':
+            document = _add(document, path, _remove(document, operation['from']))
+        elif op == 'copy':
+            document = _add(document, path, copy.deepcopy(_value(document, operation['from'])))
+        elif op == 'test':
+            if _value(document, path) != operation['value']:
+                raise ValueError(f"JSON patch test failed at {path}")
+        else:
+            raise ValueError(f"Unknown JSON patch operation: {op}")
+    return document
+
+
+class LiveZoneTracker:
+    """
+    Zone counters of one game in progress, updated with the plays completed since the last poll.
+
+    `processed_plays` is the number of leading plays of the feed already counted and `timecode` the
+    timecode of the feed held. `final` turns true once the game is over.
+    """
+
+    def __init__(self, gamepk, metrics=None):
+        self.gamepk = gamepk
+        self.metrics = _validate_metrics(metrics)
+        self.flags = metric_flags(self.metrics)
+        self.feed = None
+        self.timecode = None
+        self.processed_plays = 0
+        self.partial = ZonePartial.empty(self.flags)
+        self.final = False
+
+    def _fetch_feed(self):
+        return api_get('game', {'gamePk': self.gamepk})
+
+    def _fetch_changes(self):
+        # Returns None when nothing changed since the feed held, the new feed otherwise
+        if self.timecode is None:
+            return self._fetch_feed()
+        timestamps = api_get('game_timestamps', {'gamePk': self.gamepk})
+        if not timestamps or timestamps[-1] == self.timecode:
+            return None
+
+        diff = api_get('game_diff', {'gamePk': self.gamepk, 'startTimecode': self.timecode,
+                                     'endTimecode': timestamps[-1]})
+        if isinstance(diff, dict):
+            # The endpoint answers with the whole feed when the patch would be larger
+            return diff
+        feed = self.feed
+        try:
+            for patch in diff:
+                feed = apply_json_patch(feed, patch.get('diff', []))
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            log(logging.WARNING, 'live_poll', "Could not apply the live feed patch of game %s, reloading it: %s",
+                self.gamepk, e, gamepk=self.gamepk)
+            return self._fetch_feed()
+        return feed
+
+    def poll(self):
+        """
+        Bring the feed up to date and count the newly completed plays.
+
+        Returns:
+        - int: Number of plays counted by this poll.
+        """
+        with stage('live_poll', gamepk=self.gamepk):
+            feed = self._fetch_feed() if self.feed is None else self._fetch_changes()
+            if feed is None:
+                return 0
+            return self.update(feed)
+
+    def update(self, feed):
+        """
+        Replace the held feed and count the plays completed since the previous one.
+        """
+        self.feed = feed
+        self.timecode = feed.get('metaData', {}).get('timeStamp', self.timecode)
+        self.final = feed.get('gameData', {}).get('status', {}).get('abstractGameState') == 'Final'
+
+        all_plays = feed.get('liveData', {}).get('plays', {}).get('allPlays', [])
+        if len(all_plays) < self.processed_plays:
+            # Plays were taken back (e.g. a replay review), count the game again
+            self.processed_plays = 0
+            self.partial = ZonePartial.empty(self.flags)
+
+        new_plays = []
+        for play in all_plays[self.processed_plays:]:
+            if not play.get('about', {}).get('isComplete'):
+                break
+            new_plays.append(play)
+        if not new_plays:
+            return 0
+
+        table = build_pitch_table([IndexedGame(self.gamepk, {'allPlays': new_plays})])
+        self.partial = self.partial.merge(ZonePartial.from_table(table, self.flags))
+        self.processed_plays += len(new_plays)
+        count('events_scanned', len(table), stage='live_poll')
+        return len(new_plays)
+
+    def batting_order(self, team='away'):
+        """
+        Return the current batting order of 'home' or 'away', read from the held feed.
+        """
+        if self.feed is None:
+            return []
+        return batting_order_from_feed(self.feed, team)
+
+    def zone_grids(self, batter_ids=None, view='catcher'):
+        """
+        Compute the zone metrics of the game so far.
+
+        Parameters:
+        - batter_ids (list): Optional. Batters to report. Defaults to both batting orders of the game.
+        - view (str): 'catcher' or 'pitcher'. Default is 'catcher'.
+
+        Returns:
+        - dict: {metric: ZoneGrid}
+        """
+        if view not in VIEWS:
+            raise ValueError(f"view should be one of {VIEWS}.")
+        if batter_ids is None:
+            batter_ids = self.batting_order('away') + self.batting_order('home')
+        partial = self.partial.select(batter_ids)
+        return zone_grids_from_field_grids(partial.grids, list(batter_ids), self.metrics, view)
+
+
+async def follow_game(tracker, interval=10, on_update=None):
+    """
+    Poll a tracker every `interval` seconds until its game is final.
+
+    `on_update(tracker)` is called after every poll that counted new plays. Failed polls are
+    logged and retried at the next interval.
+    """
+    while True:
+        try:
+            new_plays = await asyncio.to_thread(tracker.poll)
+        except Exception as e:
+            log(logging.ERROR, 'live_poll', "Error polling game %s: %s", tracker.gamepk, e, gamepk=tracker.gamepk)
+            new_plays = 0
+
+        if new_plays and on_update is not None:
+            on_update(tracker)
+        if tracker.final:
+            return tracker
+        await asyncio.sleep(interval)
+
+
+async def follow_games(gamepks=None, metrics=None, interval=10, on_update=None):
+    """
+    Follow several games at once, by default every game of today's `fetch_gamepks` slate.
+
+    Parameters:
+    - gamepks (list): Optional. Games to follow.
+    - metrics (list): Optional. Names from `ZONE_METRICS`. Defaults to every metric.
+    - interval (float): Seconds between two polls of a game. Default is 10.
+    - on_update (callable): Optional. Called with the LiveZoneTracker of a game whenever it counted new plays.
+
+    Returns:
+    - dict: {gamepk: LiveZoneTracker} once every game is final.
+    """
+    if gamepks is None:
+        from .zone_analysis import fetch_gamepks
+
+        gamepks = [getattr(game, 'gamepk', game) for game in fetch_gamepks()]
+
+    trackers = {gamepk: LiveZoneTracker(gamepk, metrics) for gamepk in gamepks}
+    await asyncio.gather(*(follow_game(tracker, interval, on_update) for tracker in trackers.values()))
+    return trackers
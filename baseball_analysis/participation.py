@@ -0,0 +1,178 @@
+"""
+Persistent index of the games each player appeared in.
+
+Every final game is scanned once for its batters and pitchers. Appearances are kept as sorted
+parallel arrays of (player, role, date, gamePk), so a player's games in any date window are a
+contiguous slice found with a binary search: looking up the last games of a lineup only downloads
+the games not scanned yet, however long the window. The index grows with `update` as games finish
+and is saved to a .npz file between runs.
+"""
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from .data_fetch import KEY_SCALE
+from .data_fetch import add_new_final_games
+from .data_fetch import parse_date
+from .instrumentation import count
+from .instrumentation import stage
+
+ROLES = ('batter', 'pitcher')
+
+# Rows are searched by (player * len(ROLES) + role) * KEY_SCALE + date ordinal
+
+
+def _role_code(role):
+    if role not in ROLES:
+        raise ValueError(f"role should be one of {ROLES}.")
+    return ROLES.index(role)
+
+
+def game_participants(indexed_game):
+    """
+    Return (batter IDs, pitcher IDs) of an IndexedGame: every batter with a play, and every pitcher
+    who threw a pitch.
+    """
+    pitchers = np.unique(np.asarray(indexed_game.columns['pitcher'], dtype=np.int64))
+    return list(indexed_game.rows_by_batter), pitchers[pitchers >= 0].tolist()
+
+
+class ParticipationIndex:
+    """
+    Appearances of players in the games added so far, as batter and as pitcher.
+
+    Rows are sorted by player, role, game date and gamePk, with their search keys precomputed.
+    `scanned_gamepks` holds every game added, including games nobody appeared in, so they are not
+    downloaded again.
+
+    An index may be shared between threads: the arrays are replaced under a lock that lookups also take,
+    so they never see them half updated, and concurrent updates run one after the other.
+    """
+    __slots__ = ('players', 'roles', 'game_dates', 'gamepks', 'scanned_gamepks', '_keys', '_scanned', '_lock',
+                 '_update_lock')
+
+    def __init__(self, players=None, roles=None, game_dates=None, gamepks=None, scanned_gamepks=None):
+        self.players = np.asarray([] if players is None else players, dtype=np.int64)
+        self.roles = np.asarray([] if roles is None else roles, dtype=np.int8)
+        self.game_dates = np.asarray([] if game_dates is None else game_dates, dtype=np.int64)
+        self.gamepks = np.asarray([] if gamepks is None else gamepks, dtype=np.int64)
+        self.scanned_gamepks = np.unique(np.asarray([] if scanned_gamepks is None else scanned_gamepks,
+                                                    dtype=np.int64))
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self._sort()
+
+    def __len__(self):
+        return len(self.players)
+
+    def __repr__(self):
+        return f"ParticipationIndex(appearances={len(self)}, games={len(self.scanned_gamepks)})"
+
+    def held_gamepks(self):
+        with self._lock:
+            return set(self._scanned)
+
+    def _sort(self):
+        keys = (self.players * len(ROLES) + self.roles) * KEY_SCALE + self.game_dates
+        order = np.lexsort((self.gamepks, keys))
+        self.players = self.players[order]
+        self.roles = self.roles[order]
+        self.game_dates = self.game_dates[order]
+        self.gamepks = self.gamepks[order]
+        self._keys = keys[order]
+        self._scanned = set(self.scanned_gamepks.tolist())
+
+    def add_games(self, games, game_dates):
+        """
+        Add the appearances of IndexedGames. `game_dates` maps each gamePk to its date. Games already held are skipped.
+
+        Returns:
+        - int: Number of games added.
+        """
+        with self._lock:
+            players, roles, dates, gamepks, added = [], [], [], [], set()
+            for game in games:
+                gamepk = int(game.gamepk)
+                if gamepk in self._scanned or gamepk in added:
+                    continue
+                added.add(gamepk)
+                game_date = parse_date(game_dates[game.gamepk]).toordinal()
+                for role, player_ids in enumerate(game_participants(game)):
+                    players.extend(player_ids)
+                    roles.extend([role] * len(player_ids))
+                    dates.extend([game_date] * len(player_ids))
+                    gamepks.extend([gamepk] * len(player_ids))
+            if not added:
+                return 0
+
+            self.players = np.concatenate([self.players, np.asarray(players, dtype=np.int64)])
+            self.roles = np.concatenate([self.roles, np.asarray(roles, dtype=np.int8)])
+            self.game_dates = np.concatenate([self.game_dates, np.asarray(dates, dtype=np.int64)])
+            self.gamepks = np.concatenate([self.gamepks, np.asarray(gamepks, dtype=np.int64)])
+            self.scanned_gamepks = np.union1d(self.scanned_gamepks, np.asarray(sorted(added), dtype=np.int64))
+            self._sort()
+        count('games_scanned', len(added), stage='participation')
+        return len(added)
+
+    def update(self, start_date, end_date, max_workers=1, requests_per_second=None, downloaded=None):
+        """
+        Add the final games scheduled between two dates (both included) that are not held yet, with
+        `add_new_final_games`. Run it again with the latest dates to add newly finished games.
+        When `downloaded` is a dict, the IndexedGames downloaded are also put in it by gamePk.
+
+        Returns:
+        - int: Number of games added.
+        """
+        def add_games(games, game_dates):
+            if downloaded is not None:
+                downloaded.update((game.gamepk, game) for game in games)
+            return self.add_games(games, game_dates)
+
+        with self._update_lock, stage('participation', start_date=str(start_date), end_date=str(end_date)):
+            return add_new_final_games(add_games, self.held_gamepks(), start_date, end_date,
+                                       max_workers, requests_per_second)
+
+    def _window_rows(self, player_ids, role, start_date, end_date):
+        prefixes = (np.asarray(list(player_ids), dtype=np.int64) * len(ROLES) + _role_code(role)) * KEY_SCALE
+        first = 0 if start_date is None else parse_date(start_date).toordinal()
+        last = KEY_SCALE - 1 if end_date is None else parse_date(end_date).toordinal()
+        starts = np.searchsorted(self._keys, prefixes + first, side='left')
+        stops = np.searchsorted(self._keys, prefixes + last, side='right')
+        return starts, stops
+
+    def appearances(self, player_id, role='batter', start_date=None, end_date=None):
+        """
+        Return the (date, gamePk) appearances of a player between two optional dates (both included), in date order.
+        """
+        with self._lock:
+            starts, stops = self._window_rows([player_id], role, start_date, end_date)
+            rows = slice(int(starts[0]), int(stops[0]))
+            game_dates, gamepks = self.game_dates[rows].tolist(), self.gamepks[rows].tolist()
+        return [(datetime.fromordinal(game_date).date(), gamepk) for game_date, gamepk in zip(game_dates, gamepks)]
+
+    def last_games(self, player_ids, last_n=5, start_date=None, end_date=None, role='batter'):
+        """
+        Return {player_id: [gamepk, ...]} with each player's last `last_n` games between two optional dates
+        (both included), in date order, like `get_last_n_gamepks_of_lineup`.
+        """
+        player_ids = list(player_ids)
+        with self._lock:
+            starts, stops = self._window_rows(player_ids, role, start_date, end_date)
+            starts = np.maximum(starts, stops - last_n)
+            return {player_id: self.gamepks[start:stop].tolist()
+                    for player_id, start, stop in zip(player_ids, starts.tolist(), stops.tolist())}
+
+    def save(self, path):
+        """
+        Write the index to a compressed .npz file.
+        """
+        with self._lock:
+            arrays = dict(players=self.players, roles=self.roles, game_dates=self.game_dates,
+                          gamepks=self.gamepks, scanned_gamepks=self.scanned_gamepks)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['players'], data['roles'], data['game_dates'], data['gamepks'], data['scanned_gamepks'])
@@ -0,0 +1,257 @@
+"""
+Persistent columnar store of extracted pitches, read back through memory-mapped NumPy arrays.
+
+Layout of a store directory:
+
+    season=2023/date=2023-06-01/part-<first gamePk>-<last gamePk>/
+        meta.json         rows, gamePks, categories of the text columns
+        batters.npy       sorted distinct batters of the part, used to skip parts
+        <column>.npy      one array per column of `PITCH_COLUMNS`; text columns hold category codes
+
+Parts are immutable. New games are appended as new parts, written to a temporary directory
+first and renamed into place, so readers never see half-written data.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .cache import FINAL_STATUSES
+from .data_fetch import api_schedule
+from .data_fetch import fetch_scheduled_games
+from .data_fetch import parse_date
+from .data_fetch import set_data_source
+from .instrumentation import count
+from .instrumentation import stage
+from .pitch_table import CATEGORY_COLUMNS
+from .pitch_table import PITCH_COLUMNS
+from .pitch_table import PITCH_DTYPES
+from .pitch_table import build_pitch_table
+
+
+def set_pitch_store(store):
+    """
+    Install a PitchStore the lineup metric functions read pitches from instead of the Stats API.
+    Pass None to go back to the API. Same as `set_data_source`.
+    """
+    set_data_source(store)
+
+
+class PitchStore:
+    """
+    Pitch tables (see `build_pitch_table`) partitioned by season and game date.
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.expanduser(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _date_directory(self, game_date):
+        return os.path.join(self.directory, f"season={game_date.year}", f"date={game_date.isoformat()}")
+
+    def partitions(self, start_date=None, end_date=None):
+        """
+        Yield (game date, part directory) for every part between two dates, in date order.
+        """
+        start_date = parse_date(start_date)
+        end_date = parse_date(end_date)
+        for season in sorted(os.listdir(self.directory)):
+            if not season.startswith('season='):
+                continue
+            year = int(season[len('season='):])
+            if (start_date and year < start_date.year) or (end_date and year > end_date.year):
+                continue
+            season_directory = os.path.join(self.directory, season)
+            for date_name in sorted(os.listdir(season_directory)):
+                game_date = parse_date(date_name[len('date='):])
+                if (start_date and game_date < start_date) or (end_date and game_date > end_date):
+                    continue
+                date_directory = os.path.join(season_directory, date_name)
+                for part in sorted(os.listdir(date_directory)):
+                    if part.startswith('part-'):
+                        yield game_date, os.path.join(date_directory, part)
+
+    def stored_gamepks(self, start_date=None, end_date=None):
+        gamepks = set()
+        for _, part in self.partitions(start_date, end_date):
+            gamepks.update(self._meta(part)['gamepks'])
+        return gamepks
+
+    def append(self, table, game_date):
+        """
+        Store the pitch table of the games of one date as a new part.
+        """
+        if len(table) == 0:
+            return None
+        game_date = parse_date(game_date)
+        gamepks = sorted(int(gamepk) for gamepk in table['game_pk'].unique())
+
+        date_directory = self._date_directory(game_date)
+        os.makedirs(date_directory, exist_ok=True)
+        name = f"part-{gamepks[0]}-{gamepks[-1]}"
+        temporary = tempfile.mkdtemp(prefix='.part-', dir=date_directory)
+        try:
+            categories = {}
+            for column in PITCH_COLUMNS:
+                values = table[column]
+                if column in CATEGORY_COLUMNS:
+                    values = values.astype('category')
+                    categories[column] = [str(value) for value in values.cat.categories]
+                    values = values.cat.codes.astype(np.int16)
+                np.save(os.path.join(temporary, f"{column}.npy"), values.to_numpy())
+            np.save(os.path.join(temporary, 'batters.npy'), np.unique(table['batter'].to_numpy()))
+            with open(os.path.join(temporary, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump({'rows': len(table), 'gamepks': gamepks, 'categories': categories}, f)
+            with self._lock:
+                part = os.path.join(date_directory, name)
+                suffix = 1
+                while os.path.exists(part):
+                    suffix += 1
+                    part = os.path.join(date_directory, f"{name}-{suffix}")
+                os.rename(temporary, part)
+        except BaseException:
+            shutil.rmtree(temporary, ignore_errors=True)
+            raise
+        return part
+
+    def _meta(self, part):
+        with open(os.path.join(part, 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+
+    def _column(self, part, column):
+        return np.load(os.path.join(part, f"{column}.npy"), mmap_mode='r')
+
+    def _part_mask(self, part, batter_ids, zones, gamepks):
+        # Returns (False, None) to skip the part, (True, None) to read all of it, (True, mask) to read some rows
+        if batter_ids is not None and not np.isin(self._column(part, 'batters'), batter_ids).any():
+            return False, None
+        mask = None
+        for column, values in (('batter', batter_ids), ('zone', zones), ('game_pk', gamepks)):
+            if values is not None:
+                column_mask = np.isin(self._column(part, column), values)
+                mask = column_mask if mask is None else mask & column_mask
+        return mask is None or bool(mask.any()), mask
+
+    def read(self, batter_ids=None, start_date=None, end_date=None, zones=None, gamepks=None, columns=None):
+        """
+        Read a pitch table, only loading the parts and rows that pass the filters.
+
+        Parameters:
+        - batter_ids (list): Optional. Batters to keep.
+        - start_date, end_date (str): Optional. Game date range, 'YYYY-MM-DD', both included.
+        - zones (list): Optional. Zone codes to keep.
+        - gamepks (list): Optional. Games to keep.
+        - columns (list): Optional. Columns to load. Defaults to `PITCH_COLUMNS`.
+
+        Returns:
+        - pandas.DataFrame: A pitch table, as returned by `build_pitch_table`.
+        """
+        columns = list(PITCH_COLUMNS if columns is None else columns)
+        batter_ids = None if batter_ids is None else np.asarray(list(batter_ids), dtype=np.int64)
+        zones = None if zones is None else np.asarray(list(zones), dtype=np.int8)
+        gamepks = None if gamepks is None else np.asarray(list(gamepks), dtype=np.int64)
+
+        pieces = {column: [] for column in columns}
+        with stage('store_read'):
+            for _, part in self.partitions(start_date, end_date):
+                selected, mask = self._part_mask(part, batter_ids, zones, gamepks)
+                if not selected:
+                    continue
+                meta = self._meta(part)
+                for column in columns:
+                    values = self._column(part, column)
+                    # Without filters the memory-mapped column is used as is; with filters only matching rows are copied
+                    values = values if mask is None else values[mask]
+                    if column in CATEGORY_COLUMNS:
+                        values = pd.Categorical.from_codes(values, meta['categories'][column])
+                    pieces[column].append(values)
+
+            data = {}
+            for column in columns:
+                if column in CATEGORY_COLUMNS:
+                    data[column] = (pd.api.types.union_categoricals(pieces[column]) if pieces[column]
+                                    else pd.Categorical([]))
+                elif len(pieces[column]) == 1:
+                    data[column] = pieces[column][0]
+                else:
+                    data[column] = (np.concatenate(pieces[column]) if pieces[column]
+                                    else np.empty(0, dtype=PITCH_DTYPES[column]))
+            table = pd.DataFrame(data, columns=columns, copy=False)
+        count('events_scanned', len(table), stage='store_read')
+        return table
+
+    def player_games(self, batter_ids, start_date=None, end_date=None):
+        """
+        Return {batter_id: [gamepk, ...]} with the stored games each batter appeared in, in date order.
+        """
+        batter_ids = list(batter_ids)
+        player_games = {batter_id: [] for batter_id in batter_ids}
+        wanted = np.asarray(batter_ids, dtype=np.int64)
+        for _, part in self.partitions(start_date, end_date):
+            if not np.isin(self._column(part, 'batters'), wanted).any():
+                continue
+            batters = self._column(part, 'batter')
+            mask = np.isin(batters, wanted)
+            pairs = np.unique(np.stack([self._column(part, 'game_pk')[mask], batters[mask]], axis=1), axis=0)
+            for gamepk, batter_id in pairs.tolist():
+                player_games[batter_id].append(gamepk)
+        return player_games
+
+    def lineup_table(self, lineup_ids, last_n_days=10, from_date=None, last_n_pks=5):
+        """
+        Read the pitches of each lineup player's last games, with the window semantics of `find_lineup_games`.
+
+        Returns:
+        - tuple: (player IDs, pitch table)
+        """
+        from_date = datetime.now().date() if from_date is None else parse_date(from_date)
+        start_date = from_date - timedelta(days=last_n_days)
+        end_date = from_date - timedelta(days=1)
+
+        player_games = self.player_games(lineup_ids, start_date, end_date)
+        player_games = {player_id: gamepks[-last_n_pks:] for player_id, gamepks in player_games.items()}
+        gamepks = {gamepk for gamepks in player_games.values() for gamepk in gamepks}
+        table = self.read(list(player_games), start_date, end_date, gamepks=gamepks)
+
+        # Keep each player's rows of their own games only
+        keep = np.zeros(len(table), dtype=bool)
+        batters = table['batter'].to_numpy()
+        game_pks = table['game_pk'].to_numpy()
+        for player_id, player_gamepks in player_games.items():
+            keep |= (batters == player_id) & np.isin(game_pks, player_gamepks)
+        return list(player_games), table[keep].reset_index(drop=True)
+
+    def backfill(self, start_date, end_date, max_workers=1, requests_per_second=None):
+        """
+        Download the final games scheduled between two dates that are not stored yet and append them.
+
+        Run it again with the latest dates to append newly finished games; after an error it resumes
+        from the first date that was not written.
+
+        Returns:
+        - int: Number of games added.
+        """
+        stored = self.stored_gamepks(start_date, end_date)
+        games = [game for game in api_schedule(start_date=start_date, end_date=end_date)
+                 if game.get('status') in FINAL_STATUSES and game['game_id'] not in stored]
+
+        added = 0
+        pending_date, pending_games = None, []
+        # Games come in schedule order, so each date is appended as soon as the next one starts
+        for game, indexed_game in fetch_scheduled_games(games, max_workers, requests_per_second):
+            if game['game_date'] != pending_date and pending_games:
+                self.append(build_pitch_table(pending_games), pending_date)
+                added += len(pending_games)
+                pending_games = []
+            pending_date = game['game_date']
+            pending_games.append(indexed_game)
+        if pending_games:
+            self.append(build_pitch_table(pending_games), pending_date)
+            added += len(pending_games)
+        return added
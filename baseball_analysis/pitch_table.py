@@ -0,0 +1,158 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .data_fetch import PITCH_FLOAT_FIELDS
+from .data_fetch import PITCH_INT_FIELDS
+from .data_fetch import PITCH_TEXT_FIELDS
+from .instrumentation import log
+
+# Zone codes run from 1 to 14, so a batter's zone counters fit in one row of this width
+ZONE_SLOTS = 15
+
+SWING_DESCRIPTIONS = ('Swinging Strike', 'Swinging Strike (Blocked)', 'In play, out(s)',
+                      'Foul Tip', 'In play, run(s)', 'In play, no out', 'Foul')
+MISS_DESCRIPTIONS = ('Swinging Strike', 'Swinging Strike (Blocked)')
+BASES_BY_EVENT = {'Single': 1, 'Double': 2, 'Triple': 3, 'Home Run': 4}
+
+PITCH_COLUMNS = ('game_pk', 'batter', 'pitcher', 'zone', 'call_code', 'call_description', 'description',
+                 'is_in_play', 'is_out', 'is_at_bat', 'event', 'balls', 'strikes', 'is_sac_fly',
+                 'balls_before', 'strikes_before', 'pitch_hand', 'pitch_type', 'px', 'pz')
+CATEGORY_COLUMNS = ('call_code', 'call_description', 'description', 'event', 'pitch_hand', 'pitch_type')
+# dtype of every column that is not a category
+PITCH_DTYPES = {
+    'game_pk': np.int64, 'batter': np.int64, 'pitcher': np.int64, 'zone': np.int8,
+    'is_in_play': bool, 'is_out': bool, 'is_at_bat': bool, 'balls': np.int8, 'strikes': np.int8,
+    'is_sac_fly': bool, 'balls_before': np.int8, 'strikes_before': np.int8, 'px': np.float64, 'pz': np.float64,
+}
+
+
+def _new_columns():
+    return {column: [] for column in PITCH_COLUMNS}
+
+
+def append_game_pitches(columns, indexed_game, batter_ids=None):
+    """
+    Append one row per pitch of an IndexedGame to `columns`, a dict of column lists.
+
+    Only the rows of `batter_ids` are copied when given, using the game's batter index.
+    """
+    gamepk = indexed_game.gamepk
+    batters = indexed_game.rows_by_batter if batter_ids is None else batter_ids
+    game_columns = indexed_game.columns
+
+    for batter_id in batters:
+        for _ in range(indexed_game.plays_without_events.get(batter_id, 0)):
+            log(logging.WARNING, 'event_scan', "No play events found for play in game %s", gamepk, gamepk=gamepk)
+
+        start, stop = indexed_game.batter_rows(batter_id)
+        if start == stop:
+            continue
+
+        columns['game_pk'].extend([gamepk] * (stop - start))
+        columns['batter'].extend([batter_id] * (stop - start))
+        for field in PITCH_INT_FIELDS + PITCH_FLOAT_FIELDS + PITCH_TEXT_FIELDS:
+            columns[field].extend(game_columns[field][start:stop])
+
+
+def columns_to_table(columns):
+    table = pd.DataFrame({
+        column: columns[column] if column in CATEGORY_COLUMNS else np.asarray(columns[column], dtype=PITCH_DTYPES[column])
+        for column in PITCH_COLUMNS
+    }, columns=list(PITCH_COLUMNS))
+    for column in CATEGORY_COLUMNS:
+        table[column] = table[column].astype('category')
+    return table
+
+
+def build_pitch_table(games, batter_ids=None):
+    """
+    Flatten play-by-play documents into a columnar pitch table.
+
+    Parameters:
+    - games (iterable): IndexedGame objects, or (IndexedGame, batter_ids) pairs to restrict
+      each game to some batters.
+    - batter_ids (iterable): Optional. Batters to keep for games given without their own batter list.
+
+    Returns:
+    - pandas.DataFrame: One row per pitch with the columns in `PITCH_COLUMNS`. Missing zones,
+      balls and strikes are stored as -1, missing locations as NaN, and the text columns are categorical.
+    """
+    columns = _new_columns()
+    for game in games:
+        if isinstance(game, tuple):
+            indexed_game, game_batters = game
+        else:
+            indexed_game, game_batters = game, batter_ids
+        append_game_pitches(columns, indexed_game, game_batters)
+    return columns_to_table(columns)
+
+
+def _category_mask(column, predicate):
+    # Evaluate the predicate once per distinct value instead of once per pitch
+    categories = column.cat.categories
+    if len(categories) == 0:
+        return np.zeros(len(column), dtype=bool)
+    category_mask = np.fromiter((predicate(value) for value in categories), dtype=bool, count=len(categories))
+    codes = column.cat.codes.to_numpy()
+    return np.where(codes >= 0, category_mask[codes], False)
+
+
+def pitch_flags(table):
+    """
+    Compute the per-pitch contributions to every zone counter as NumPy arrays.
+    """
+    swing = _category_mask(table['call_description'], lambda value: value in SWING_DESCRIPTIONS)
+    miss = swing & _category_mask(table['description'], lambda value: value in MISS_DESCRIPTIONS)
+    in_play_safe = _category_mask(table['description'],
+                                  lambda value: 'In play, no out' in value or 'In play, run(s)' in value)
+
+    events = table['event']
+    bases_by_category = np.array([BASES_BY_EVENT.get(value, 0) for value in events.cat.categories], dtype=np.int64)
+    event_codes = events.cat.codes.to_numpy()
+    if len(bases_by_category):
+        bases = np.where(event_codes >= 0, bases_by_category[event_codes], 0)
+    else:
+        bases = np.zeros(len(table), dtype=np.int64)
+
+    at_bat = table['is_at_bat'].to_numpy()
+    hit = table['is_in_play'].to_numpy() & ~table['is_out'].to_numpy()
+
+    return {
+        'pitch': np.ones(len(table), dtype=bool),
+        'swing': swing,
+        'miss': miss,
+        'called_strike': _category_mask(table['description'], lambda value: value == 'Called Strike'),
+        'at_bat': at_bat,
+        'total_bases': np.where(at_bat & in_play_safe, bases, 0),
+        'hit': hit,
+        'walk': _category_mask(table['description'], lambda value: value == 'Ball') & (table['balls'].to_numpy() == 4),
+        'hbp': _category_mask(table['call_description'], lambda value: value == 'Hit By Pitch'),
+        'sac_fly': table['is_sac_fly'].to_numpy(),
+    }
+
+
+def zone_bincount(table, player_ids, weights):
+    """
+    Sum `weights` per (player, zone) with a single bincount.
+
+    Returns:
+    - numpy.ndarray: Integer array of shape (len(player_ids), ZONE_SLOTS), indexed by the position of the
+      player in `player_ids` and the zone code. Rows of other batters or without a zone are ignored.
+    """
+    player_ids = np.asarray(player_ids, dtype=np.int64)
+    if len(player_ids) == 0 or len(table) == 0:
+        return np.zeros((len(player_ids), ZONE_SLOTS), dtype=np.int64)
+
+    order = np.argsort(player_ids, kind='stable')
+    sorted_ids = player_ids[order]
+    batters = table['batter'].to_numpy()
+    zones = table['zone'].to_numpy().astype(np.int64)
+
+    positions = np.clip(np.searchsorted(sorted_ids, batters), 0, len(sorted_ids) - 1)
+    valid = (sorted_ids[positions] == batters) & (zones >= 0) & (zones < ZONE_SLOTS)
+    keys = order[positions[valid]] * ZONE_SLOTS + zones[valid]
+
+    sums = np.bincount(keys, weights=np.asarray(weights)[valid], minlength=len(player_ids) * ZONE_SLOTS)
+    return sums.reshape(len(player_ids), ZONE_SLOTS).round().astype(np.int64)
@@ -0,0 +1,96 @@
+import threading
+import unicodedata
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def normalize_name(name):
+    """
+    Lowercase a player name and strip accents, punctuation and repeated whitespace,
+    so 'José  Ramírez' and 'jose ramirez' share the same key.
+    """
+    name = unicodedata.normalize('NFKD', str(name))
+    name = ''.join(char for char in name if not unicodedata.combining(char))
+    name = ''.join(char if char.isalnum() or char.isspace() else ' ' for char in name.lower())
+    return ' '.join(name.split())
+
+
+class PlayerIdIndex:
+    """
+    In-memory index of the Chadwick register: MLBAM id to name and normalized name to MLBAM id.
+
+    When several players share a name, the one who played in MLB most recently wins.
+    """
+
+    def __init__(self, register):
+        register = register.dropna(subset=['key_mlbam'])
+        if 'mlb_played_last' in register.columns:
+            register = register.sort_values('mlb_played_last', ascending=False, na_position='last', kind='stable')
+
+        first_names = register['name_first'].fillna('').astype(str)
+        last_names = register['name_last'].fillna('').astype(str)
+        mlb_ids = register['key_mlbam'].astype('int64').tolist()
+        keys = (first_names + ' ' + last_names).map(normalize_name).tolist()
+
+        self.names_by_id = {}
+        for mlb_id, first, last in zip(mlb_ids, first_names.tolist(), last_names.tolist()):
+            self.names_by_id.setdefault(mlb_id, (first, last))
+
+        self.ids_by_name = {}
+        for mlb_id, key in zip(mlb_ids, keys):
+            self.ids_by_name.setdefault(key, mlb_id)
+
+    def lookup_ids(self, names):
+        """
+        Return the MLBAM id of each name, or None for names that are not in the register.
+        """
+        return [self.ids_by_name.get(normalize_name(name)) for name in names]
+
+    def lookup_names(self, mlb_ids):
+        """
+        Return {mlb_id: 'First Last'} for the ids found in the register.
+        """
+        names = {}
+        for mlb_id in mlb_ids:
+            name = self.names_by_id.get(int(mlb_id))
+            if name is not None:
+                names[mlb_id] = f"{name[0].capitalize()} {name[1].capitalize()}"
+        return names
+
+
+def get_player_id_index():
+    """
+    Return the process-wide PlayerIdIndex, downloading the Chadwick register on first use.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                import pybaseball
+
+                _index = PlayerIdIndex(pybaseball.chadwick_register())
+    return _index
+
+
+def lookup_mlb_ids(names):
+    """
+    Resolve many player names to MLBAM ids in one pass over the register index.
+
+    Parameters:
+    - names (list): Player names such as 'Mike Trout'. Case, accents and punctuation are ignored.
+
+    Returns:
+    - list: MLBAM ids in the order of `names`, None where a name is unknown.
+    """
+    return get_player_id_index().lookup_ids(names)
+
+
+def lookup_player_names(mlb_ids):
+    """
+    Resolve many MLBAM ids to 'First Last' names.
+
+    Returns:
+    - dict: {mlb_id: name} for the ids found in the register.
+    """
+    return get_player_id_index().lookup_names(mlb_ids)
@@ -0,0 +1,215 @@
+"""
+Rolling zone metrics from per-(batter, game) partial counts.
+
+Every final game is scanned once into integer per-(batter, game, zone) sums of the pitch flags. Rows
+are kept in each batter's game order with running totals, so the counts of a player's last games in
+any date window are the difference of two prefix sums. Sliding the window by a day only fetches and
+scans the games that were not held yet.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from .data_fetch import KEY_SCALE
+from .data_fetch import add_new_final_games
+from .data_fetch import parse_date
+from .instrumentation import count
+from .instrumentation import stage
+from .pitch_table import ZONE_SLOTS
+from .pitch_table import build_pitch_table
+from .pitch_table import pitch_flags
+from .zone_engine import VIEWS
+from .zone_engine import _validate_metrics
+from .zone_engine import metric_flags
+from .zone_engine import zone_grids_from_field_grids
+
+
+class GameZonePartials:
+    """
+    Pitch flag sums per (batter, game, zone) of the games added so far.
+
+    Rows are sorted by batter, game date and gamePk. `counts` maps each pitch flag to an int64 array of
+    shape (rows, ZONE_SLOTS). A batter has a row for every game they batted in, even without a pitch.
+    `flags` defaults to the counters of every metric. `scanned_gamepks` holds every game added, including
+    games without a row, so they are not downloaded again; it defaults to the gamePks of the rows.
+    """
+    __slots__ = ('flags', 'batters', 'game_dates', 'gamepks', 'counts', 'scanned_gamepks', '_scanned', '_prefix')
+
+    def __init__(self, flags=None, batters=None, game_dates=None, gamepks=None, counts=None, scanned_gamepks=None):
+        self.flags = tuple(metric_flags(_validate_metrics(None)) if flags is None else flags)
+        self.batters = np.asarray([] if batters is None else batters, dtype=np.int64)
+        self.game_dates = np.asarray([] if game_dates is None else game_dates, dtype=np.int64)
+        self.gamepks = np.asarray([] if gamepks is None else gamepks, dtype=np.int64)
+        self.counts = counts if counts is not None else {
+            flag: np.zeros((0, ZONE_SLOTS), dtype=np.int64) for flag in self.flags}
+        self.scanned_gamepks = np.unique(np.asarray(self.gamepks if scanned_gamepks is None else scanned_gamepks,
+                                                    dtype=np.int64))
+        self._scanned = set(self.scanned_gamepks.tolist())
+        self._prefix = None
+
+    def __len__(self):
+        return len(self.batters)
+
+    def __repr__(self):
+        return f"GameZonePartials(rows={len(self)}, games={len(self.held_gamepks())}, flags={list(self.flags)})"
+
+    def held_gamepks(self):
+        return set(self._scanned)
+
+    def add_games(self, games, game_dates):
+        """
+        Scan IndexedGames into partials. `game_dates` maps each gamePk to its date. Games already held are skipped.
+
+        Returns:
+        - int: Number of games added.
+        """
+        games = list({game.gamepk: game for game in games if game.gamepk not in self._scanned}.values())
+        if not games:
+            return 0
+
+        batters, gamepks, lengths = [], [], []
+        for game in games:
+            for batter_id, (start, stop) in game.rows_by_batter.items():
+                batters.append(batter_id)
+                gamepks.append(game.gamepk)
+                lengths.append(stop - start)
+
+        with stage('event_scan'):
+            table = build_pitch_table(games)
+            # The table holds each game's batters in `rows_by_batter` order, so rows map to pairs by repetition
+            pairs = np.repeat(np.arange(len(lengths)), lengths)
+            zones = table['zone'].to_numpy().astype(np.int64)
+            valid = (zones >= 0) & (zones < ZONE_SLOTS)
+            keys = pairs[valid] * ZONE_SLOTS + zones[valid]
+
+            table_flags = pitch_flags(table)
+            size = len(lengths) * ZONE_SLOTS
+            counts = {flag: np.bincount(keys, weights=np.asarray(table_flags[flag])[valid], minlength=size)
+                      .round().astype(np.int64).reshape(-1, ZONE_SLOTS)
+                      for flag in self.flags}
+        count('games_scanned', len(games), stage='event_scan')
+        count('events_scanned', len(table), stage='event_scan')
+
+        dates = [parse_date(game_dates[gamepk]).toordinal() for gamepk in gamepks]
+        self._extend(batters, dates, gamepks, counts)
+        self.scanned_gamepks = np.union1d(self.scanned_gamepks,
+                                          np.asarray([game.gamepk for game in games], dtype=np.int64))
+        self._scanned = set(self.scanned_gamepks.tolist())
+        return len(games)
+
+    def _extend(self, batters, game_dates, gamepks, counts):
+        batters = np.concatenate([self.batters, np.asarray(batters, dtype=np.int64)])
+        game_dates = np.concatenate([self.game_dates, np.asarray(game_dates, dtype=np.int64)])
+        gamepks = np.concatenate([self.gamepks, np.asarray(gamepks, dtype=np.int64)])
+        order = np.lexsort((gamepks, game_dates, batters))
+
+        self.batters = batters[order]
+        self.game_dates = game_dates[order]
+        self.gamepks = gamepks[order]
+        self.counts = {flag: np.concatenate([self.counts[flag], counts[flag]])[order] for flag in self.flags}
+        self._prefix = None
+
+    def _prefix_sums(self):
+        # Running totals with a leading zero row: the sum of rows [start, stop) is prefix[stop] - prefix[start]
+        if self._prefix is None:
+            self._prefix = {}
+            for flag, counts in self.counts.items():
+                prefix = np.zeros((len(counts) + 1, ZONE_SLOTS), dtype=np.int64)
+                np.cumsum(counts, axis=0, out=prefix[1:])
+                self._prefix[flag] = prefix
+        return self._prefix
+
+    def player_games(self, player_ids, start_date, end_date, last_n_pks=5):
+        """
+        Return {player_id: [gamepk, ...]} with each player's last `last_n_pks` held games between two dates
+        (both included), like `get_last_n_gamepks_of_lineup`.
+        """
+        starts, stops = self._window_rows(player_ids, start_date, end_date, last_n_pks)
+        return {player_id: self.gamepks[start:stop].tolist()
+                for player_id, start, stop in zip(player_ids, starts.tolist(), stops.tolist())}
+
+    def _window_rows(self, player_ids, start_date, end_date, last_n_pks):
+        player_ids = np.asarray(list(player_ids), dtype=np.int64)
+        keys = self.batters * KEY_SCALE + self.game_dates
+        first = np.searchsorted(keys, player_ids * KEY_SCALE + parse_date(start_date).toordinal(), side='left')
+        stops = np.searchsorted(keys, player_ids * KEY_SCALE + parse_date(end_date).toordinal(), side='right')
+        return np.maximum(first, stops - last_n_pks), stops
+
+    def field_grids(self, player_ids, start_date, end_date, last_n_pks=5, flags=None):
+        """
+        Sum the counts of each player's last `last_n_pks` games between two dates (both included).
+
+        Returns:
+        - dict: {flag: integer array of shape (len(player_ids), ZONE_SLOTS)}, as expected by
+          `zone_grids_from_field_grids`.
+        """
+        starts, stops = self._window_rows(player_ids, start_date, end_date, last_n_pks)
+        prefix = self._prefix_sums()
+        return {flag: prefix[flag][stops] - prefix[flag][starts] for flag in (self.flags if flags is None else flags)}
+
+    def save(self, path):
+        """
+        Write the partials to a compressed .npz file.
+        """
+        arrays = {f'counts_{flag}': counts for flag, counts in self.counts.items()}
+        np.savez_compressed(path, batters=self.batters, game_dates=self.game_dates, gamepks=self.gamepks,
+                            scanned_gamepks=self.scanned_gamepks, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            counts = {name[len('counts_'):]: data[name] for name in data.files if name.startswith('counts_')}
+            # Files saved before `scanned_gamepks` was kept fall back to the gamePks of the rows
+            scanned_gamepks = data['scanned_gamepks'] if 'scanned_gamepks' in data.files else None
+            return cls(list(counts), data['batters'], data['game_dates'], data['gamepks'], counts, scanned_gamepks)
+
+
+def update_game_partials(partials, lineup_ids, start_date, end_date, max_workers=1, requests_per_second=None,
+                         discovery='schedule'):
+    """
+    Add the final games of a date window that may involve the lineup and are not held yet,
+    with `add_new_final_games`.
+
+    Returns:
+    - int: Number of games added.
+    """
+    with stage('discovery', discovery=discovery):
+        return add_new_final_games(partials.add_games, partials.held_gamepks(), start_date, end_date,
+                                   max_workers, requests_per_second, lineup_ids, discovery)
+
+
+def compute_rolling_zone_grids(lineup_ids, metrics=None, last_n_days=10, from_date=None, last_n_pks=5,
+                               partials=None, max_workers=1, requests_per_second=None, discovery='schedule',
+                               view='catcher'):
+    """
+    Calculate zone metrics for a lineup from per-game partials, fetching only the games not held yet.
+
+    Takes the same parameters as `compute_zone_grids`, plus:
+    - partials (GameZonePartials): Optional. Partials kept between calls; the games of the window are added to
+      it. Its flags must cover the metrics. Defaults to new partials used for this call only.
+
+    Returns:
+    - dict: {metric: ZoneGrid}
+
+    Raises:
+    - ValueError: If an unknown metric, discovery mode or view is requested, or the partials lack a metric's counters.
+    """
+    metrics = _validate_metrics(metrics)
+    if view not in VIEWS:
+        raise ValueError(f"view should be one of {VIEWS}.")
+    flags = metric_flags(metrics)
+    if partials is None:
+        partials = GameZonePartials(flags)
+    missing = [flag for flag in flags if flag not in partials.flags]
+    if missing:
+        raise ValueError(f"The partials were built without the counters {missing}.")
+
+    from_date = datetime.now().date() if from_date is None else parse_date(from_date)
+    start_date = from_date - timedelta(days=last_n_days)
+    end_date = from_date - timedelta(days=1)
+    lineup_ids = list(lineup_ids)
+
+    update_game_partials(partials, lineup_ids, start_date, end_date, max_workers, requests_per_second, discovery)
+    with stage('aggregate'):
+        grids = partials.field_grids(lineup_ids, start_date, end_date, last_n_pks, flags)
+    return zone_grids_from_field_grids(grids, lineup_ids, metrics, view)
@@ -0,0 +1,209 @@
+"""
+League-wide zone metrics over a date range, map-reduced over a process pool.
+
+The scheduled games are split into shards. Each shard is turned into a `ZonePartial` holding integer
+per-(batter, zone) sums of the pitch flags the metrics need. Partials are merged by addition, so the
+result does not depend on how games were sharded and matches the serial path exactly.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .cache import FINAL_STATUSES
+from .data_fetch import RateLimiter
+from .data_fetch import api_schedule
+from .data_fetch import get_game_cache
+from .data_fetch import load_indexed_game
+from .data_fetch import set_game_cache
+from .instrumentation import count
+from .instrumentation import enabled
+from .instrumentation import record_events
+from .instrumentation import report_events
+from .instrumentation import stage
+from .pitch_table import ZONE_SLOTS
+from .pitch_table import build_pitch_table
+from .zone_engine import VIEWS
+from .zone_engine import _validate_metrics
+from .zone_engine import field_grids
+from .zone_engine import metric_flags
+from .zone_engine import zone_grids_from_field_grids
+
+
+class ZonePartial:
+    """
+    Mergeable per-(batter, zone) flag sums over some games.
+
+    `player_ids` is an int64 array, sorted for partials built by `from_table` and `merge`, and every
+    grid in `grids` is an int64 array of shape (len(player_ids), ZONE_SLOTS) with the sums of one pitch flag.
+    """
+    __slots__ = ('player_ids', 'grids')
+
+    def __init__(self, player_ids, grids):
+        self.player_ids = np.asarray(player_ids, dtype=np.int64)
+        self.grids = grids
+
+    @classmethod
+    def empty(cls, flags):
+        return cls(np.empty(0, dtype=np.int64), {flag: np.zeros((0, ZONE_SLOTS), dtype=np.int64) for flag in flags})
+
+    @classmethod
+    def from_table(cls, table, flags):
+        player_ids = np.unique(table['batter'].to_numpy())
+        return cls(player_ids, field_grids(table, player_ids, flags))
+
+    def merge(self, other):
+        """
+        Return a new partial with the sums of both.
+        """
+        player_ids = np.union1d(self.player_ids, other.player_ids)
+        own_rows = np.searchsorted(player_ids, self.player_ids)
+        other_rows = np.searchsorted(player_ids, other.player_ids)
+
+        grids = {}
+        for flag, grid in self.grids.items():
+            merged = np.zeros((len(player_ids), ZONE_SLOTS), dtype=np.int64)
+            merged[own_rows] += grid
+            merged[other_rows] += other.grids[flag]
+            grids[flag] = merged
+        return ZonePartial(player_ids, grids)
+
+    def select(self, player_ids):
+        """
+        Return the partial restricted to `player_ids`, in that order. Players without pitches get zero rows.
+        Only valid on sorted partials.
+        """
+        player_ids = np.asarray(player_ids, dtype=np.int64)
+        rows = np.clip(np.searchsorted(self.player_ids, player_ids), 0, max(len(self.player_ids) - 1, 0))
+        found = (self.player_ids[rows] == player_ids) if len(self.player_ids) else np.zeros(len(player_ids), dtype=bool)
+
+        grids = {}
+        for flag, grid in self.grids.items():
+            selected = np.zeros((len(player_ids), ZONE_SLOTS), dtype=np.int64)
+            selected[found] = grid[rows[found]]
+            grids[flag] = selected
+        return ZonePartial(player_ids, grids)
+
+    def keep(self, mask):
+        """
+        Return the partial restricted to the rows where `mask` is true.
+        """
+        return ZonePartial(self.player_ids[mask], {flag: grid[mask] for flag, grid in self.grids.items()})
+
+
+def shard_partial(gamepks, flags, requests_per_second=None):
+    """
+    Map step: fetch a shard of games and sum their pitch flags per (batter, zone).
+
+    Raises:
+    - GameFetchError: If a game cannot be downloaded.
+    """
+    rate_limiter = RateLimiter(requests_per_second) if requests_per_second else None
+
+    games = [load_indexed_game(gamepk, final=True, rate_limiter=rate_limiter) for gamepk in gamepks]
+
+    with stage('event_scan'):
+        table = build_pitch_table(games)
+    count('games_scanned', len(games), stage='event_scan')
+    count('events_scanned', len(table), stage='event_scan')
+    return ZonePartial.from_table(table, flags)
+
+
+def _shard_partial_item(item):
+    # Runs in a worker process. The parent's game cache arrives pickled, which opens it again here, and
+    # the events are handed back to the parent rather than reported to the hooks copied into the worker.
+    gamepks, flags, requests_per_second, game_cache, report = item
+    set_game_cache(game_cache)
+    if not report:
+        return shard_partial(gamepks, flags, requests_per_second), []
+    with record_events() as events:
+        partial = shard_partial(gamepks, flags, requests_per_second)
+    return partial, events
+
+
+def season_gamepks(start_date, end_date, game_types=None):
+    """
+    Return the gamepks of the final games scheduled between two dates, optionally only of some game
+    types (e.g. ('R',) for the regular season). Games postponed, in progress or not played yet are left
+    out, as their play-by-play would be cached as final.
+    """
+    gamepks = {}
+    for game in api_schedule(start_date=start_date, end_date=end_date):
+        if game.get('status') not in FINAL_STATUSES:
+            continue
+        if game_types is None or game.get('game_type') in game_types:
+            gamepks.setdefault(game['game_id'])
+    return list(gamepks)
+
+
+def compute_season_partial(gamepks, flags, processes=None, shards_per_process=4, requests_per_second=None):
+    """
+    Map every game to a ZonePartial of the given pitch flags in a process pool and reduce them into one.
+
+    With `processes` unset or 1 the games are aggregated serially in the current process.
+    `requests_per_second` bounds the total request rate and is split evenly between the worker processes.
+    The installed game cache is sent to every worker, so it must be picklable; the caches of
+    `baseball_analysis.cache` are, and open their file or database again in the worker. The events of
+    the workers are reported in the current process.
+    """
+    gamepks = list(gamepks)
+
+    if not processes or processes <= 1 or len(gamepks) <= 1:
+        return shard_partial(gamepks, flags, requests_per_second)
+
+    shard_count = min(len(gamepks), processes * shards_per_process)
+    shard_size = math.ceil(len(gamepks) / shard_count)
+    shards = [gamepks[i:i + shard_size] for i in range(0, len(gamepks), shard_size)]
+    workers = min(processes, len(shards))
+    worker_rate = requests_per_second / workers if requests_per_second else None
+    items = [(shard, flags, worker_rate, get_game_cache(), enabled()) for shard in shards]
+
+    partial = ZonePartial.empty(flags)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard, events in executor.map(_shard_partial_item, items):
+            report_events(events)
+            partial = partial.merge(shard)
+    return partial
+
+
+def compute_season_zone_grids(start_date, end_date, metrics=None, batter_ids=None, min_pitches=0,
+                              processes=None, game_types=None, requests_per_second=None, view='catcher'):
+    """
+    Calculate zone metrics for every batter over a date range, such as a full season.
+
+    Parameters:
+    - start_date (str): First date of the range in 'YYYY-MM-DD' format.
+    - end_date (str): Last date of the range in 'YYYY-MM-DD' format.
+    - metrics (list): Optional. Names from `ZONE_METRICS`. Defaults to every metric.
+    - batter_ids (list): Optional. Batters to report, in this order. Defaults to every batter seen.
+    - min_pitches (int): Leave out batters who saw fewer pitches over the range. Default is 0.
+    - processes (int): Optional. Number of worker processes the games are sharded across.
+    - game_types (tuple): Optional. Schedule game types to keep, e.g. ('R',). Defaults to every game.
+    - requests_per_second (float): Optional. Upper bound on the total request rate of the workers.
+    - view (str): 'catcher' or 'pitcher'. Default is 'catcher'.
+
+    Returns:
+    - dict: {metric: ZoneGrid}
+
+    Raises:
+    - ValueError: If an unknown metric or view is requested.
+    """
+    metrics = _validate_metrics(metrics)
+    if view not in VIEWS:
+        raise ValueError(f"view should be one of {VIEWS}.")
+
+    gamepks = season_gamepks(start_date, end_date, game_types)
+    flags = metric_flags(metrics)
+    if min_pitches and 'pitch' not in flags:
+        flags.append('pitch')
+
+    with stage('season', games=len(gamepks), processes=processes or 1):
+        partial = compute_season_partial(gamepks, flags, processes,
+                                         requests_per_second=requests_per_second)
+
+    if batter_ids is not None:
+        partial = partial.select(batter_ids)
+    if min_pitches:
+        partial = partial.keep(partial.grids['pitch'].sum(axis=1) >= min_pitches)
+
+    return zone_grids_from_field_grids(partial.grids, partial.player_ids.tolist(), metrics, view)
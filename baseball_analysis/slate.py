@@ -0,0 +1,101 @@
+"""
+Zone metrics for every lineup of a day's slate in one pass.
+
+The lineups of all games are collected first. Their players' last games are then discovered and
+downloaded once for the union of the lineups, so a game shared by several lineups, or scanned to
+find the games of several players, is fetched a single time. One aggregation over the union is
+split back into per-lineup results.
+"""
+import logging
+from datetime import datetime
+
+from .data_fetch import api_get
+from .data_fetch import api_schedule
+from .data_fetch import batting_order_from_feed
+from .instrumentation import log
+from .instrumentation import stage
+from .zone_engine import VIEWS
+from .zone_engine import _validate_metrics
+from .zone_engine import field_grids
+from .zone_engine import load_lineup_window
+from .zone_engine import metric_flags
+from .zone_engine import zone_grids_from_field_grids
+
+TEAMS = ('away', 'home')
+
+
+def slate_lineups(date=None, gamepks=None):
+    """
+    Read the posted batting orders of every game of a date, with one live feed request per game.
+
+    Parameters:
+    - date (str): Optional. Date of the slate in 'YYYY-MM-DD' format. Defaults to today.
+    - gamepks (list): Optional. Games to read instead of the whole schedule of the date.
+
+    Returns:
+    - dict: {gamepk: {'away': [player_id, ...], 'home': [...]}}, leaving out teams whose batting order
+      is not posted yet and games whose feed could not be read.
+    """
+    if gamepks is None:
+        date = datetime.now().date().strftime("%Y-%m-%d") if date is None else date
+        gamepks = list(dict.fromkeys(game['game_id'] for game in api_schedule(date=date)))
+
+    lineups = {}
+    for gamepk in gamepks:
+        try:
+            feed = api_get('game', {'gamePk': gamepk})
+            game_lineups = {team: batting_order_from_feed(feed, team) for team in TEAMS}
+        except Exception as e:
+            log(logging.ERROR, 'slate', "Error reading the lineups of game %s: %s", gamepk, e, gamepk=gamepk)
+            continue
+        lineups[gamepk] = {team: lineup for team, lineup in game_lineups.items() if lineup}
+    return lineups
+
+
+def compute_slate_zone_grids(date=None, metrics=None, last_n_days=10, last_n_pks=5, lineups=None,
+                             max_workers=1, requests_per_second=None, discovery='schedule', view='catcher'):
+    """
+    Calculate the zone metrics of every lineup of a slate, fetching each game of the window once.
+
+    Every lineup gets the same result as `compute_zone_grids(lineup, from_date=date, ...)`.
+
+    Parameters:
+    - date (str): Optional. Date of the slate in 'YYYY-MM-DD' format; the window ends the day before. Defaults to today.
+    - metrics (list): Optional. Names from `ZONE_METRICS`. Defaults to every metric.
+    - last_n_days (int): Number of days before `date` to consider for games. Default is 10 days.
+    - last_n_pks (int): Number of recent games to consider for each player. Default is 5 games.
+    - lineups (dict): Optional. {gamepk: {team: [player_id, ...]}} as returned by `slate_lineups`.
+      Defaults to the posted lineups of every game of the date.
+    - max_workers, requests_per_second, discovery, view: As in `compute_zone_grids`.
+
+    Returns:
+    - dict: {gamepk: {team: {metric: ZoneGrid}}}
+
+    Raises:
+    - ValueError: If an unknown metric, discovery mode or view is requested.
+    """
+    metrics = _validate_metrics(metrics)
+    if view not in VIEWS:
+        raise ValueError(f"view should be one of {VIEWS}.")
+    date = datetime.now().date().strftime("%Y-%m-%d") if date is None else date
+
+    with stage('slate', date=date):
+        if lineups is None:
+            lineups = slate_lineups(date)
+        # Players in the order of their first lineup, each once
+        player_ids = list(dict.fromkeys(player_id for game_lineups in lineups.values()
+                                        for lineup in game_lineups.values() for player_id in lineup))
+
+        player_ids, table = load_lineup_window(player_ids, last_n_days, date, last_n_pks,
+                                               max_workers, requests_per_second, discovery)
+        grids = field_grids(table, player_ids, metric_flags(metrics))
+
+    rows = {player_id: row for row, player_id in enumerate(player_ids)}
+    slate_grids = {}
+    for gamepk, game_lineups in lineups.items():
+        slate_grids[gamepk] = {}
+        for team, lineup in game_lineups.items():
+            lineup_rows = [rows[player_id] for player_id in lineup]
+            lineup_grids = {flag: grid[lineup_rows] for flag, grid in grids.items()}
+            slate_grids[gamepk][team] = zone_grids_from_field_grids(lineup_grids, lineup, metrics, view)
+    return slate_grids
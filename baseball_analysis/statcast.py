@@ -0,0 +1,222 @@
+"""
+Statcast as an alternative pitch source for the zone metrics.
+
+Baseball Savant serves every pitch of a date range as CSV. One `pybaseball.statcast` pull per chunk of
+days replaces one play-by-play request per game. The chunks are aligned on fixed boundaries and cached
+locally once Savant has settled their games, so sliding windows reuse them. Rows are mapped onto the pitch
+table of `build_pitch_table`, with Stats API call and event names, so the same zone counting applies.
+"""
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .data_fetch import parse_date
+from .instrumentation import count
+from .instrumentation import stage
+from .pitch_table import columns_to_table
+
+# Statcast columns read by `statcast_pitch_table`
+STATCAST_COLUMNS = ('game_date', 'game_pk', 'at_bat_number', 'pitch_number', 'batter', 'pitcher', 'zone',
+                    'description', 'events', 'balls', 'strikes', 'p_throws', 'pitch_type', 'plate_x', 'plate_z',
+                    'bat_score', 'post_bat_score')
+
+# Statcast pitch descriptions and the Stats API call code and description they stand for. Balls in play
+# are split by outcome, see `statcast_pitch_table`.
+CALLS_BY_DESCRIPTION = {
+    'ball': ('B', 'Ball'),
+    'blocked_ball': ('*B', 'Ball In Dirt'),
+    'pitchout': ('P', 'Pitchout'),
+    'called_strike': ('C', 'Called Strike'),
+    'swinging_strike': ('S', 'Swinging Strike'),
+    'swinging_strike_blocked': ('W', 'Swinging Strike (Blocked)'),
+    'foul': ('F', 'Foul'),
+    'foul_tip': ('T', 'Foul Tip'),
+    'foul_bunt': ('L', 'Foul Bunt'),
+    'missed_bunt': ('M', 'Missed Bunt'),
+    'bunt_foul_tip': ('O', 'Foul Tip Bunt'),
+    'hit_by_pitch': ('H', 'Hit By Pitch'),
+}
+IN_PLAY_CALLS = {'out': ('X', 'In play, out(s)'), 'no_out': ('D', 'In play, no out'), 'runs': ('E', 'In play, run(s)')}
+
+BALL_CODES = ('B', '*B', 'P')
+STRIKE_CODES = ('C', 'S', 'W', 'T', 'M', 'O')
+FOUL_CODES = ('F', 'L')
+
+# Statcast events that retire the batter, on the last pitch of the plate appearance
+OUT_EVENTS = ('field_out', 'force_out', 'grounded_into_double_play', 'double_play', 'triple_play',
+              'fielders_choice_out', 'sac_fly', 'sac_bunt', 'sac_fly_double_play', 'sac_bunt_double_play',
+              'other_out', 'strikeout', 'strikeout_double_play')
+
+# Days per Statcast pull; Savant caps a single search at about 25,000 rows (roughly a week of games)
+CHUNK_DAYS = 7
+
+# Days after its last day before a chunk is cached: Savant publishes late games with a delay
+SETTLE_DAYS = 2
+
+
+def download_statcast(start_date, end_date):
+    """
+    Download every pitch between two dates (both included) from Baseball Savant.
+    """
+    import pybaseball
+
+    return pybaseball.statcast(start_dt=start_date.isoformat(), end_dt=end_date.isoformat(), verbose=False)
+
+
+def _event_name(event):
+    return event.replace('_', ' ').title() if isinstance(event, str) else None
+
+
+def statcast_pitch_table(frame):
+    """
+    Map Statcast rows onto a pitch table (see `build_pitch_table`).
+
+    Statcast gives the count before each pitch and the plate appearance's event on its last pitch only;
+    the count after the pitch and the event of every pitch are derived from them.
+    """
+    frame = frame.sort_values(['game_date', 'game_pk', 'at_bat_number', 'pitch_number'], kind='stable')
+    rows = len(frame)
+
+    plate_appearance = frame['game_pk'].astype(np.int64) * 1000 + frame['at_bat_number'].astype(np.int64)
+    events = frame['events'].groupby(plate_appearance.to_numpy()).transform('last')
+
+    descriptions = frame['description'].to_numpy()
+    in_play = descriptions == 'hit_into_play'
+    # Like the Stats API `isOut`, set on balls in play and strike threes that retire the batter
+    is_out = frame['events'].isin(OUT_EVENTS).to_numpy()
+    scored = (frame['post_bat_score'] > frame['bat_score']).to_numpy()
+
+    call_codes = np.empty(rows, dtype=object)
+    call_descriptions = np.empty(rows, dtype=object)
+    for description, (code, text) in CALLS_BY_DESCRIPTION.items():
+        matches = descriptions == description
+        call_codes[matches] = code
+        call_descriptions[matches] = text
+    for outcome, matches in (('out', in_play & is_out), ('runs', in_play & ~is_out & scored),
+                             ('no_out', in_play & ~is_out & ~scored)):
+        call_codes[matches], call_descriptions[matches] = IN_PLAY_CALLS[outcome]
+
+    balls_before = frame['balls'].fillna(-1).to_numpy(dtype=np.int64)
+    strikes_before = frame['strikes'].fillna(-1).to_numpy(dtype=np.int64)
+    adds_strike = np.isin(call_codes, STRIKE_CODES) | (np.isin(call_codes, FOUL_CODES) & (strikes_before < 2))
+    balls = np.where(balls_before >= 0, balls_before + np.isin(call_codes, BALL_CODES), -1)
+    strikes = np.where(strikes_before >= 0, strikes_before + adds_strike, -1)
+
+    columns = {
+        'game_pk': frame['game_pk'].to_numpy(dtype=np.int64),
+        'batter': frame['batter'].to_numpy(dtype=np.int64),
+        'pitcher': frame['pitcher'].to_numpy(dtype=np.int64),
+        'zone': frame['zone'].fillna(-1).to_numpy(dtype=np.int64),
+        'call_code': call_codes,
+        'call_description': call_descriptions,
+        'description': call_descriptions,
+        'is_in_play': in_play,
+        'is_out': is_out,
+        # Every Statcast row belongs to a plate appearance
+        'is_at_bat': np.ones(rows, dtype=bool),
+        'event': events.map(_event_name).to_numpy(dtype=object),
+        'balls': balls,
+        'strikes': strikes,
+        # Like the Stats API path, which never finds a runner on the pitch event itself
+        'is_sac_fly': np.zeros(rows, dtype=bool),
+        'balls_before': balls_before,
+        'strikes_before': strikes_before,
+        'pitch_hand': frame['p_throws'].to_numpy(dtype=object),
+        'pitch_type': frame['pitch_type'].to_numpy(dtype=object),
+        'px': frame['plate_x'].to_numpy(dtype=np.float64),
+        'pz': frame['plate_z'].to_numpy(dtype=np.float64),
+    }
+    table = columns_to_table(columns)
+    table['game_date'] = pd.to_datetime(frame['game_date']).dt.date.to_numpy()
+    return table
+
+
+class StatcastSource:
+    """
+    Pitch source backed by chunked Statcast pulls, cached in `cache_directory` when given.
+
+    Chunks are `chunk_days` long and aligned on fixed dates. A chunk is cached once it ended more than
+    `settle_days` days ago; more recent chunks are downloaded again on every call, as their games may
+    not be over or not be published yet.
+    """
+
+    def __init__(self, cache_directory=None, chunk_days=CHUNK_DAYS, settle_days=SETTLE_DAYS):
+        self.cache_directory = None if cache_directory is None else os.path.expanduser(cache_directory)
+        if self.cache_directory is not None:
+            os.makedirs(self.cache_directory, exist_ok=True)
+        self.chunk_days = chunk_days
+        self.settle_days = settle_days
+
+    def chunks(self, start_date, end_date):
+        """
+        Return the (first day, last day) of the aligned chunks covering a date range.
+        """
+        start = parse_date(start_date).toordinal() // self.chunk_days * self.chunk_days
+        chunks = []
+        while start <= parse_date(end_date).toordinal():
+            chunks.append((date.fromordinal(start), date.fromordinal(start + self.chunk_days - 1)))
+            start += self.chunk_days
+        return chunks
+
+    def _chunk_path(self, first_day, last_day):
+        return os.path.join(self.cache_directory, f"statcast_{first_day.isoformat()}_{last_day.isoformat()}.pkl.gz")
+
+    def _load_chunk(self, first_day, last_day):
+        path = None if self.cache_directory is None else self._chunk_path(first_day, last_day)
+        if path is not None and os.path.exists(path):
+            count('cache_hits', source='statcast')
+            return pd.read_pickle(path, compression='gzip')
+
+        count('cache_misses', source='statcast')
+        count('http_requests', endpoint='statcast')
+        with stage('statcast', start_date=first_day.isoformat()):
+            frame = download_statcast(first_day, last_day)
+        frame = frame[[column for column in STATCAST_COLUMNS if column in frame.columns]]
+
+        if path is not None and last_day < date.today() - timedelta(days=self.settle_days):
+            temporary = f"{path}.tmp"
+            frame.to_pickle(temporary, compression='gzip')
+            os.replace(temporary, path)
+        return frame
+
+    def read(self, start_date, end_date, batter_ids=None):
+        """
+        Return the pitch table of a date range (both days included), with an extra `game_date` column.
+        """
+        start_date = parse_date(start_date)
+        end_date = parse_date(end_date)
+
+        frames = []
+        for first_day, last_day in self.chunks(start_date, end_date):
+            frame = self._load_chunk(first_day, last_day)
+            game_dates = pd.to_datetime(frame['game_date']).dt.date
+            keep = (game_dates >= start_date) & (game_dates <= end_date)
+            if batter_ids is not None:
+                keep &= frame['batter'].isin(list(batter_ids))
+            frames.append(frame[keep])
+
+        frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=list(STATCAST_COLUMNS))
+        table = statcast_pitch_table(frame)
+        count('events_scanned', len(table), stage='statcast')
+        return table
+
+    def lineup_table(self, lineup_ids, last_n_days=10, from_date=None, last_n_pks=5):
+        """
+        Return (player IDs, pitch table) of each lineup player's last games, with the window semantics
+        of `find_lineup_games`.
+        """
+        from_date = datetime.now().date() if from_date is None else parse_date(from_date)
+        lineup_ids = list(lineup_ids)
+        table = self.read(from_date - timedelta(days=last_n_days), from_date - timedelta(days=1), lineup_ids)
+
+        keep = np.zeros(len(table), dtype=bool)
+        batters = table['batter'].to_numpy()
+        game_pks = table['game_pk'].to_numpy()
+        for player_id in lineup_ids:
+            player_rows = batters == player_id
+            # The table is in game order, so the first appearances of the gamePks are chronological
+            gamepks = pd.unique(game_pks[player_rows])[-last_n_pks:]
+            keep |= player_rows & np.isin(game_pks, gamepks)
+        return lineup_ids, table[keep].drop(columns='game_date').reset_index(drop=True)
@@ -0,0 +1,215 @@
+"""
+Pooled HTTP transport for the Stats API.
+
+Every request of the package goes through one `requests.Session`, so connections are kept alive and
+reused across calls and threads. Requests time out, and 429 or 5xx answers, timeouts and connection
+errors are retried a bounded number of times with jittered exponential backoff. Documents served with
+an ETag or Last-Modified header are kept with it and revalidated on the next request for the same URL,
+so an unchanged document costs a 304 without a body.
+"""
+import functools
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .instrumentation import count
+from .instrumentation import stage
+
+BASE_URL = 'https://statsapi.mlb.com/api/'
+
+# Path of every Stats API endpoint the package requests, with the names `statsapi` gives them.
+# Parameters named in the path fill it, the others are sent as query parameters.
+ENDPOINTS = {
+    'game': 'v1.1/game/{gamePk}/feed/live',
+    'game_diff': 'v1.1/game/{gamePk}/feed/live/diffPatch',
+    'game_timestamps': 'v1.1/game/{gamePk}/feed/live/timestamps',
+    'game_playByPlay': 'v1/game/{gamePk}/playByPlay',
+    'people': 'v1/people',
+    'schedule': 'v1/schedule',
+    'transactions': 'v1/transactions',
+}
+
+# Answers worth trying again: rate limited or a transient server error
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+def endpoint_url(endpoint, params):
+    """
+    Build the URL and query parameters of a Stats API request.
+
+    Returns:
+    - tuple: (url, {query parameter: value})
+
+    Raises:
+    - ValueError: If the endpoint is unknown or a path parameter is missing.
+    """
+    path = ENDPOINTS.get(endpoint)
+    if path is None:
+        raise ValueError(f"Invalid endpoint ({endpoint}).")
+
+    path_values, query = {}, {}
+    for name, value in params.items():
+        (path_values if '{' + name + '}' in path else query)[name] = str(value)
+    try:
+        return BASE_URL + path.format(**path_values), query
+    except KeyError as e:
+        raise ValueError(f"Missing required path parameter {{{e.args[0]}}}") from None
+
+
+def schedule_games(document):
+    """
+    List the games of a schedule document with the fields the package reads, named like the entries
+    of `statsapi.schedule`: game_id, game_date, game_datetime, status and game_type.
+    """
+    return [
+        {'game_id': game['gamePk'], 'game_date': day['date'], 'game_datetime': game.get('gameDate'),
+         'status': game.get('status', {}).get('detailedState'), 'game_type': game.get('gameType')}
+        for day in document.get('dates', []) for game in day.get('games', [])
+    ]
+
+
+def _reopen_after_fork(reference):
+    transport = reference()
+    if transport is not None:
+        transport._open()
+
+
+class Transport:
+    """
+    Stats API client over a pooled keep-alive session, safe to share between threads.
+
+    Parameters:
+    - pool_size (int): Connections kept open to the API. Default is 16.
+    - retries (int): Retries of a request after a 429 or 5xx answer, a timeout or a connection error. Default is 4.
+    - backoff (float): Retry n waits a random delay of up to backoff * 2 ** n seconds. Default is 0.5.
+    - max_backoff (float): Upper bound of a retry delay, also applied to Retry-After headers. Default is 30 seconds.
+    - timeout (float or tuple): Connect and read timeouts in seconds. Default is (3.05, 30).
+    - validated_bytes (int): Size of the documents kept for conditional requests, least recently used
+      dropped first. 0 disables conditional requests. Default is 64 MB.
+
+    A process forked from one using the transport, e.g. a worker of `compute_season_zone_grids`, gets a
+    session of its own: sharing the parent's open sockets would mix up the responses of both processes.
+    """
+
+    def __init__(self, pool_size=16, retries=4, backoff=0.5, max_backoff=30, timeout=(3.05, 30),
+                 validated_bytes=64 * 2 ** 20):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.validated_bytes = validated_bytes
+
+        # {url: (etag, last modified, body)}, in least recently used order
+        self._validated = OrderedDict()
+        self._size = 0
+        self._open()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=functools.partial(_reopen_after_fork, weakref.ref(self)))
+
+    def _open(self):
+        # Also run in a forked child, where the inherited session and lock are dropped without being used
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.session.close()
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _send(self, url, query, headers):
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.get(url, params=query, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                delay = self._delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+                delay = self._delay(attempt, response.headers.get('Retry-After'))
+                response.close()
+            count('http_retries')
+            time.sleep(delay)
+
+    def _remember(self, url, etag, last_modified, body):
+        with self._lock:
+            previous = self._validated.pop(url, None)
+            if previous is not None:
+                self._size -= len(previous[2])
+            if len(body) > self.validated_bytes:
+                return
+            self._validated[url] = (etag, last_modified, body)
+            self._size += len(body)
+            while self._size > self.validated_bytes:
+                _, (_, _, dropped) = self._validated.popitem(last=False)
+                self._size -= len(dropped)
+
+    def get(self, endpoint, params=None, **kwargs):
+        """
+        Send a request to one of `ENDPOINTS` and return the decoded JSON document.
+
+        Raises:
+        - requests.HTTPError: On an error answer that is not retried, or still failing after every retry.
+        """
+        url, query = endpoint_url(endpoint, params or {})
+        key = requests.Request('GET', url, params=query).prepare().url
+
+        with self._lock:
+            validated = self._validated.get(key)
+            if validated is not None:
+                self._validated.move_to_end(key)
+        headers = {}
+        if validated is not None:
+            etag, last_modified, _ = validated
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        response = self._send(url, query, headers)
+        count('http_bytes', len(response.content), endpoint=endpoint)
+        if response.status_code == 304 and validated is not None:
+            count('http_not_modified', endpoint=endpoint)
+            body = validated[2]
+        else:
+            response.raise_for_status()
+            body = response.content
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if self.validated_bytes and (etag or last_modified):
+                self._remember(key, etag, last_modified, body)
+        # Decoded on every call, so callers may modify their document
+        with stage('decode', endpoint=endpoint):
+            return json.loads(body)
+
+    def schedule(self, date=None, start_date=None, end_date=None, team=None, sport_id=1):
+        """
+        Return the games of a date or date range, optionally of one team, as listed by `schedule_games`.
+        Like `statsapi.schedule`, a single `start_date` or `end_date` stands for that date.
+        """
+        params = {'sportId': sport_id}
+        if date is None and start_date and end_date:
+            params.update(startDate=start_date, endDate=end_date)
+        elif date or start_date or end_date:
+            params['date'] = date or start_date or end_date
+        if team:
+            params['teamId'] = team
+        return schedule_games(self.get('schedule', params))
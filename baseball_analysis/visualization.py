@@ -1,104 +1,347 @@
-import matplotlib.pyplot as plt
+import hashlib
+import io
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
 from .data_fetch import convert_id_to_mlb_id
+from .instrumentation import stage
+from .player_ids import lookup_player_names
+
+_render_cache = None
+
+# Strike zone geometry, shared by every plot
+
+# Define strike zone dimensions
+STRIKE_ZONE = {
+    'x': [2, 6, 8, 8, 4, 2, 2],
+    'y': [4, 4, 4, -2, -2, -2, 4]
+}
+
+# Define areas outside the strike zone
+OUTSIDE_ZONE = {
+    'x': [0, 6, 10, 10, 0, 0],
+    'y': [6, 6, 6, -4, -4, 6]
+}
+
+# Inside lines (vertical, then horizontal) and lines splitting the areas outside the zone
+ZONE_LINES = [
+    ([4, 4], [4, -2]),
+    ([6, 6], [4, -2]),
+    ([2, 8], [2, 2]),
+    ([2, 8], [0, 0]),
+    ([5, 5], [6, 4]),
+    ([5, 5], [-2, -4]),
+    ([0, 2], [1, 1]),
+    ([8, 10], [1, 1]),
+]
+
+# Define coordinates for each part of the strike zone
+ZONE_COORDINATES = {
+    (3, 3): [(2, 4), (4, 4), (4, 2), (2, 2)],
+    (5, 3): [(4, 4), (6, 4), (6, 2), (4, 2)],
+    (7, 3): [(6, 4), (8, 4), (8, 2), (6, 2)],
+    (3, 1): [(2, 2), (4, 2), (4, 0), (2, 0)],
+    (5, 1): [(4, 2), (6, 2), (6, 0), (4, 0)],
+    (7, 1): [(6, 2), (8, 2), (8, 0), (6, 0)],
+    (3, -1): [(2, 0), (4, 0), (4, -2), (2, -2)],
+    (5, -1): [(4, 0), (6, 0), (6, -2), (4, -2)],
+    (7, -1): [(6, 0), (8, 0), (8, -2), (6, -2)],
+    (1, 5): [(0, 6), (5, 6), (5, 4), (2, 4), (2, 1), (0, 1)],
+    (9, 5): [(5, 6), (10, 6), (10, 1), (8, 1), (8, 4), (5, 4)],
+    (1, -3): [(0, 1), (2, 1), (2, -2), (5, -2), (5, -4), (0, -4)],
+    (9, -3): [(8, 1), (10, 1), (10, -4), (5, -4), (5, -2), (8, -2)]
+}
+
+# Polygons split into x and y lists once, ready for fill()
+ZONE_POLYGONS = {
+    zone: ([x for x, _ in coordinates], [y for _, y in coordinates])
+    for zone, coordinates in ZONE_COORDINATES.items()
+}
+
+RENDER_FORMATS = ('png', 'svg')
+
+# Rulebook strike zone in feet for location heatmaps: the 17 inch plate and an average batter's height
+PLATE_STRIKE_ZONE = {
+    'x': [-0.708, 0.708, 0.708, -0.708, -0.708],
+    'y': [1.5, 1.5, 3.5, 3.5, 1.5]
+}
+
+
+def set_render_cache(cache):
+  """
+  Install a `RenderCache` the render functions look images up in before drawing them. Pass None to disable it.
+  """
+  global _render_cache
+  _render_cache = cache
+
+
+def get_render_cache():
+  return _render_cache
+
+
+def _digest_update(digest, value):
+  # Feed a value into the digest unambiguously: type tag, then content
+  if isinstance(value, np.ndarray):
+    digest.update(f"a{value.dtype.str}{value.shape}".encode())
+    digest.update(np.ascontiguousarray(value).tobytes())
+  elif isinstance(value, dict):
+    digest.update(f"d{len(value)}".encode())
+    for key, item in sorted(value.items(), key=lambda pair: repr(pair[0])):
+      _digest_update(digest, key)
+      _digest_update(digest, item)
+  elif isinstance(value, (list, tuple)):
+    digest.update(f"l{len(value)}".encode())
+    for item in value:
+      _digest_update(digest, item)
+  else:
+    digest.update(f"v{value!r};".encode())
+
+
+def render_key(*parts):
+  """
+  Content address of a render: a SHA-256 digest of everything that ends up in the image
+  (plot kind, batter, values, format and figure settings).
+  """
+  digest = hashlib.sha256()
+  _digest_update(digest, parts)
+  return digest.hexdigest()
+
+
+def _player_names(player_ids):
+  with stage('id_resolution'):
+    return lookup_player_names(player_ids)
+
+
+def _render_cached(kind, player_data, settings, render_item, processes):
+  # Render {player_id: data} as [(batter name, image)] in order, leaving out players without a name.
+  # Images are looked up by player id first, so names are only resolved for the ones to draw.
+  cache = _render_cache
+  keys = {player_id: render_key(kind, player_id, data, *settings) for player_id, data in player_data.items()}
+  found = {}
+  if cache is not None:
+    for player_id, key in keys.items():
+      entry = cache.get(key)
+      if entry is not None:
+        found[player_id] = entry
+
+  missing = [player_id for player_id in player_data if player_id not in found]
+  names = _player_names(missing) if missing else {}
+  missing = [player_id for player_id in missing if player_id in names]
+  items = [(names[player_id], player_data[player_id], *settings) for player_id in missing]
+
+  with stage('render', batters=len(items)):
+    if processes and processes > 1 and len(items) > 1:
+      with ProcessPoolExecutor(max_workers=processes) as executor:
+        rendered = list(executor.map(render_item, items))
+    else:
+      rendered = [render_item(item) for item in items]
+
+  for player_id, item, image in zip(missing, items, rendered):
+    found[player_id] = (item[0], image)
+    if cache is not None:
+      cache.set(keys[player_id], item[0], image)
+  return [found[player_id] for player_id in player_data if player_id in found]
+
+
+def zone_color(metric):
+  if metric <= 0.0:
+    return 'grey'
+  elif metric > 0.25:
+    return 'red'
+  return 'blue'
+
+
+def draw_strike_zone(ax, batter, metrics):
+  """
+  Draw one batter's strike zone values on a matplotlib Axes.
+  """
+  # Plot the strike zone
+  ax.plot(STRIKE_ZONE['x'], STRIKE_ZONE['y'], 'k-')
+  for zone, metric in metrics.items():
+    ax.text(zone[0], zone[1], str(metric), ha='center')
+
+  # Plot the areas outside the strike zone
+  ax.plot(OUTSIDE_ZONE['x'], OUTSIDE_ZONE['y'], 'k-')
+
+  for x, y in ZONE_LINES:
+    ax.plot(x, y, 'k-')
+
+  # Fill color of the zones
+  for zone, (x, y) in ZONE_POLYGONS.items():
+    metric = metrics.get(zone, None)
+    if metric is not None:
+      ax.fill(x, y, color=zone_color(metric), alpha=0.3)
+
+  ax.set_title(f'{batter}', ha='center')
+  ax.set_aspect('equal', adjustable='box')
+
+
+def draw_location_heatmap(ax, batter, values, x_edges, z_edges, vmin=0.0, vmax=None):
+  """
+  Draw one batter's location grid (x bins by z bins, NaN for empty cells) on a matplotlib Axes.
+  """
+  ax.pcolormesh(x_edges, z_edges, values.T, cmap='coolwarm', vmin=vmin, vmax=vmax, shading='flat')
+  ax.plot(PLATE_STRIKE_ZONE['x'], PLATE_STRIKE_ZONE['y'], 'k-')
+  ax.set_xlim(x_edges[0], x_edges[-1])
+  ax.set_ylim(z_edges[0], z_edges[-1])
+  ax.set_title(f'{batter}', ha='center')
+  ax.set_aspect('equal', adjustable='box')
+
 
 def visualize_strike_zone(player_data):
+  import matplotlib.pyplot as plt
+
   converted_player_data = convert_id_to_mlb_id(player_data)
   for batter, metrics in converted_player_data.items():
-
-    # Define strike zone dimensions
-    strike_zone = {
-        'x': [2, 6, 8, 8, 4, 2, 2],
-        'y': [4, 4, 4, -2, -2, -2, 4]
-    }
-
-    # Define areas outside the strike zone
-    outside_zone = {
-        'x': [0, 6, 10, 10, 0, 0],
-        'y': [6, 6, 6, -4, -4, 6]
-    }
-
-    # Plot the strike zone
-    plt.plot(strike_zone['x'], strike_zone['y'], 'k-')
-    for zone, metric in metrics.items():
-        plt.text(zone[0], zone[1], str(metric), ha='center')
-
-    # Plot the areas outside the strike zone
-    plt.plot(outside_zone['x'], outside_zone['y'], 'k-')
-
-    # inside lines
-    # vertical lines
-    x1_v = [4, 4]
-    y1_v = [4, -2]
-
-    x2_v = [6, 6]
-    y2_v = [4, -2]
-
-    # horizontal lines
-    x1_h = [2, 8]
-    y1_h = [2, 2]
-
-    x2_h = [2, 8]
-    y2_h = [0, 0]
-
-    # outside lines
-    x1_o = [5, 5]
-    y1_o = [6, 4]
-
-    x2_o = [5, 5]
-    y2_o = [-2, -4]
-
-    x3_o = [0, 2]
-    y3_o = [1, 1]
-
-    x4_o = [8, 10]
-    y4_o = [1, 1]
-
-    plt.plot(x1_v, y1_v, 'k-')
-    plt.plot(x2_v, y2_v, 'k-')
-    plt.plot(x1_h, y1_h, 'k-')
-    plt.plot(x2_h, y2_h, 'k-')
-
-    plt.plot(x1_o, y1_o, 'k-')
-    plt.plot(x2_o, y2_o, 'k-')
-    plt.plot(x3_o, y3_o, 'k-')
-    plt.plot(x4_o, y4_o, 'k-')
-
-    # Define coordinates for each part of the strike zone
-    zone_coordinates = {
-        (3, 3): [(2, 4), (4, 4), (4, 2), (2, 2)],
-        (5, 3): [(4, 4), (6, 4), (6, 2), (4, 2)],
-        (7, 3): [(6, 4), (8, 4), (8, 2), (6, 2)],
-        (3, 1): [(2, 2), (4, 2), (4, 0), (2, 0)],
-        (5, 1): [(4, 2), (6, 2), (6, 0), (4, 0)],
-        (7, 1): [(6, 2), (8, 2), (8, 0), (6, 0)],
-        (3, -1): [(2, 0), (4, 0), (4, -2), (2, -2)],
-        (5, -1): [(4, 0), (6, 0), (6, -2), (4, -2)],
-        (7, -1): [(6, 0), (8, 0), (8, -2), (6, -2)],
-        (1, 5): [(0, 6), (5, 6), (5, 4), (2, 4), (2, 1), (0, 1)],
-        (9, 5): [(5, 6), (10, 6), (10, 1), (8, 1), (8, 4), (5, 4)],
-        (1, -3): [(0, 1), (2, 1), (2, -2), (5, -2), (5, -4), (0, -4)],
-        (9, -3): [(8, 1), (10, 1), (10, -4), (5, -4), (5, -2), (8, -2)]
-    }
-
-    # Fill color of the zones
-    for zone, coordinates in zone_coordinates.items():
-        metric = metrics.get(zone, None)
-        if metric is not None:
-
-            if metric <= 0.0:
-              color = 'grey'
-              alpha = 0.3
-            elif metric > 0.25:
-              color = 'red'
-              alpha = 0.3
-            else:
-              color = 'blue'
-              alpha = 0.3
-            plt.fill([x[0] for x in coordinates], [y[1] for y in coordinates], color=color, alpha=alpha)
-
-    # Set plot limits and labels
-    plt.title(f'{batter}', ha='center')
+    with stage('render', batter=batter):
+      draw_strike_zone(plt.gca(), batter, metrics)
 
     # Show the plot
-    plt.gca().set_aspect('equal', adjustable='box')
     plt.show()
+
+
+def _figure(figsize, dpi):
+  # Figures are drawn without pyplot, and matplotlib is only imported once something is rendered
+  from matplotlib.figure import Figure
+
+  return Figure(figsize=figsize, dpi=dpi)
+
+
+def _figure_bytes(figure, fmt):
+  from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+  FigureCanvasAgg(figure)
+  buffer = io.BytesIO()
+  figure.savefig(buffer, format=fmt)
+  return buffer.getvalue()
+
+
+def render_strike_zone(batter, metrics, fmt='png', figsize=(4, 4), dpi=100):
+  """
+  Render one batter's strike zone without pyplot and return the image bytes.
+  """
+  figure = _figure(figsize, dpi)
+  draw_strike_zone(figure.add_subplot(), batter, metrics)
+  return _figure_bytes(figure, fmt)
+
+
+def _render_strike_zone_item(item):
+  batter, metrics, fmt, figsize, dpi = item
+  return render_strike_zone(batter, metrics, fmt, figsize, dpi)
+
+
+def render_strike_zone_grid(named_player_data, fmt='png', columns=3, figsize=(4, 4), dpi=100):
+  """
+  Render every batter of a lineup as one grid figure and return the image bytes.
+  """
+  rows = max(1, math.ceil(len(named_player_data) / columns))
+  figure = _figure((figsize[0] * columns, figsize[1] * rows), dpi)
+  axes = figure.subplots(rows, columns, squeeze=False).ravel()
+  for ax, (batter, metrics) in zip(axes, named_player_data.items()):
+    draw_strike_zone(ax, batter, metrics)
+  for ax in axes[len(named_player_data):]:
+    ax.set_axis_off()
+  figure.tight_layout()
+  return _figure_bytes(figure, fmt)
+
+
+def render_location_heatmap(batter, values, x_edges, z_edges, fmt='png', figsize=(4, 4), dpi=100):
+  """
+  Render one batter's location heatmap without pyplot and return the image bytes.
+  """
+  figure = _figure(figsize, dpi)
+  draw_location_heatmap(figure.add_subplot(), batter, values, x_edges, z_edges)
+  return _figure_bytes(figure, fmt)
+
+
+def _render_location_heatmap_item(item):
+  batter, (values, x_edges, z_edges), fmt, figsize, dpi = item
+  return render_location_heatmap(batter, values, x_edges, z_edges, fmt, figsize, dpi)
+
+
+def _write_image(output_dir, name, fmt, image):
+  path = os.path.join(output_dir, f"{name.replace(' ', '_')}.{fmt}")
+  with open(path, 'wb') as f:
+    f.write(image)
+  return path
+
+
+def render_strike_zones(player_data, output_dir=None, fmt='png', grid=False, columns=3,
+                        processes=None, figsize=(4, 4), dpi=100):
+  """
+  Render strike zone plots for a lineup on the non-interactive Agg backend.
+
+  Parameters:
+  - player_data (dict): {player_id: {zone coordinates: value}}, as passed to `visualize_strike_zone`.
+  - output_dir (str): Optional. Directory the images are written to. When not given the image bytes are returned.
+  - fmt (str): 'png' or 'svg'. Default is 'png'.
+  - grid (bool): Render the whole lineup as a single grid figure instead of one image per batter.
+  - columns (int): Number of columns of the grid figure. Default is 3.
+  - processes (int): Optional. Render the batters in a pool of this many processes.
+  - figsize (tuple): Size of one batter's plot in inches.
+  - dpi (int): Resolution of PNG images.
+
+  Images found in the installed render cache (see `set_render_cache`) are not drawn again, and their
+  batter names are not looked up again.
+
+  Returns:
+  - dict: {batter name: bytes or file path}. With grid=True a single bytes object or file path.
+
+  Raises:
+  - ValueError: If the format is not supported.
+  """
+  if fmt not in RENDER_FORMATS:
+    raise ValueError(f"fmt should be one of {RENDER_FORMATS}.")
+
+  if grid:
+    key = render_key('strike_zone_grid', list(player_data.items()), fmt, columns, figsize, dpi)
+    entry = None if _render_cache is None else _render_cache.get(key)
+    if entry is not None:
+      image = entry[1]
+    else:
+      named_player_data = convert_id_to_mlb_id(player_data)
+      with stage('render', grid=True):
+        image = render_strike_zone_grid(named_player_data, fmt, columns, figsize, dpi)
+      if _render_cache is not None:
+        _render_cache.set(key, None, image)
+    return image if output_dir is None else _write_image(output_dir, 'lineup', fmt, image)
+
+  rendered = {}
+  for batter, image in _render_cached('strike_zone', player_data, (fmt, figsize, dpi),
+                                      _render_strike_zone_item, processes):
+    rendered[batter] = image if output_dir is None else _write_image(output_dir, batter, fmt, image)
+  return rendered
+
+
+def render_location_heatmaps(plot_data, output_dir=None, fmt='png', processes=None, figsize=(4, 4), dpi=100):
+  """
+  Render location heatmaps for a lineup on the non-interactive Agg backend.
+
+  Parameters:
+  - plot_data (dict): {player_id: (values, x_edges, z_edges)}, as returned by `LocationGrid.to_plot_data`.
+  - output_dir (str): Optional. Directory the images are written to. When not given the image bytes are returned.
+  - fmt (str): 'png' or 'svg'. Default is 'png'.
+  - processes (int): Optional. Render the batters in a pool of this many processes.
+  - figsize (tuple): Size of one batter's plot in inches.
+  - dpi (int): Resolution of PNG images.
+
+  Images found in the installed render cache (see `set_render_cache`) are not drawn again, and their
+  batter names are not looked up again.
+
+  Returns:
+  - dict: {batter name: bytes or file path}
+
+  Raises:
+  - ValueError: If the format is not supported.
+  """
+  if fmt not in RENDER_FORMATS:
+    raise ValueError(f"fmt should be one of {RENDER_FORMATS}.")
+
+  rendered = {}
+  for batter, image in _render_cached('location_heatmap', plot_data, (fmt, figsize, dpi),
+                                      _render_location_heatmap_item, processes):
+    rendered[batter] = image if output_dir is None else _write_image(output_dir, f'{batter} heatmap', fmt, image)
+  return rendered
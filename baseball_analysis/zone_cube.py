@@ -0,0 +1,230 @@
+"""
+Pre-aggregated zone counts by batter, pitcher hand, pitch type, count and zone.
+
+A `ZoneCube` is built once from a pitch table. It then answers questions such as "vs LHP" or "on
+2-strike counts" by slicing and summing small dense arrays, without going back to play-by-play data.
+"""
+import numpy as np
+import pandas as pd
+
+from .pitch_table import ZONE_SLOTS
+from .pitch_table import pitch_flags
+from .zone_engine import VIEWS
+from .zone_engine import _validate_metrics
+from .zone_engine import load_lineup_window
+from .zone_engine import metric_flags
+from .zone_engine import zone_grids_from_field_grids
+
+PITCH_HANDS = ('L', 'R')
+
+# Ball-strike counts a pitch can be thrown in, in cube order (balls * 3 + strikes); unknown counts go to an
+# extra last slot
+COUNTS = tuple((balls, strikes) for balls in range(4) for strikes in range(3))
+
+DIMENSIONS = ('batter', 'pitch_hand', 'pitch_type', 'count', 'zone')
+
+
+def _positions(labels, values):
+    # Position of each value in `labels`, len(labels) (the unknown slot) for values not in it or missing.
+    # Only the distinct values are looked up; rows take their position through the factorized codes.
+    codes, uniques = pd.factorize(values)
+    lookup = {label: position for position, label in enumerate(labels)}
+    positions = np.fromiter((lookup.get(value, len(labels)) for value in uniques), dtype=np.int64, count=len(uniques))
+    return np.append(positions, len(labels))[codes]
+
+
+def _count_positions(balls, strikes):
+    balls = np.asarray(balls, dtype=np.int64)
+    strikes = np.asarray(strikes, dtype=np.int64)
+    known = (balls >= 0) & (balls < 4) & (strikes >= 0) & (strikes < 3)
+    return np.where(known, balls * 3 + strikes, len(COUNTS))
+
+
+def _as_list(value):
+    if value is None or isinstance(value, (list, tuple, set, frozenset)):
+        return value
+    return [value]
+
+
+class ZoneCube:
+    """
+    Dense pitch flag sums over batter x pitcher hand x pitch type x count x zone.
+
+    `cells` maps each pitch flag (see `pitch_flags`) to an int64 array of shape
+    (len(player_ids), len(PITCH_HANDS) + 1, len(pitch_types) + 1, len(COUNTS) + 1, ZONE_SLOTS).
+    The last slot of the hand, pitch type and count axes holds pitches where that value is unknown.
+    """
+    __slots__ = ('player_ids', 'pitch_types', 'cells')
+
+    def __init__(self, player_ids, pitch_types, cells):
+        self.player_ids = tuple(player_ids)
+        self.pitch_types = tuple(pitch_types)
+        self.cells = cells
+
+    def __repr__(self):
+        return f"ZoneCube(players={len(self.player_ids)}, pitch_types={self.pitch_types}, flags={list(self.cells)})"
+
+    def _indices(self, batter_ids, pitch_hands, pitch_types, counts, balls, strikes):
+        indices = [None, None, None, None]
+        if batter_ids is not None:
+            indices[0] = [self.player_ids.index(batter_id) for batter_id in _as_list(batter_ids)]
+        if pitch_hands is not None:
+            indices[1] = [PITCH_HANDS.index(hand) for hand in _as_list(pitch_hands)]
+        if pitch_types is not None:
+            indices[2] = [self.pitch_types.index(pitch_type) for pitch_type in _as_list(pitch_types)
+                          if pitch_type in self.pitch_types]
+        if counts is not None or balls is not None or strikes is not None:
+            counts = set(COUNTS if counts is None else [tuple(pitch_count) for pitch_count in counts])
+            balls = _as_list(balls)
+            strikes = _as_list(strikes)
+            indices[3] = [position for position, (pitch_balls, pitch_strikes) in enumerate(COUNTS)
+                          if (pitch_balls, pitch_strikes) in counts
+                          and (balls is None or pitch_balls in balls)
+                          and (strikes is None or pitch_strikes in strikes)]
+        return indices
+
+    def select(self, batter_ids=None, pitch_hands=None, pitch_types=None, counts=None, balls=None, strikes=None):
+        """
+        Return the cube restricted to some values of each dimension. Dimensions left to None are kept whole.
+
+        Parameters:
+        - batter_ids (list): Batters to keep, in this order.
+        - pitch_hands (list): 'L' and/or 'R'.
+        - pitch_types (list): Pitch type codes such as 'FF' or 'SL'. Unknown codes match nothing.
+        - counts (list): (balls, strikes) counts the pitch was thrown in, e.g. [(3, 2)].
+        - balls (int or list): Balls in the count the pitch was thrown in.
+        - strikes (int or list): Strikes in the count the pitch was thrown in, e.g. 2 for two-strike counts.
+
+        Filtering on a dimension drops the pitches where its value is unknown. The selected cube keeps
+        the pitch types and layout of this one, with the cells filtered out set to zero.
+        """
+        indices = self._indices(batter_ids, pitch_hands, pitch_types, counts, balls, strikes)
+        cells = {}
+        for flag, cell in self.cells.items():
+            if indices[0] is not None:
+                cell = np.take(cell, indices[0], axis=0)
+            for axis, axis_indices in enumerate(indices[1:], start=1):
+                if axis_indices is not None:
+                    # Zero the other values instead of dropping them, so every cube keeps the same layout
+                    mask = np.zeros(cell.shape[axis], dtype=cell.dtype)
+                    mask[axis_indices] = 1
+                    cell = cell * mask.reshape((-1,) + (1,) * (cell.ndim - axis - 1))
+            cells[flag] = cell
+
+        player_ids = self.player_ids if indices[0] is None else [self.player_ids[i] for i in indices[0]]
+        return ZoneCube(player_ids, self.pitch_types, cells)
+
+    def rollup(self, flag, dimensions=('batter', 'zone')):
+        """
+        Sum one pitch flag over every dimension not listed, e.g. rollup('swing', ('pitch_type',)).
+
+        Returns:
+        - numpy.ndarray: Sums with the listed dimensions as axes, in `DIMENSIONS` order.
+        """
+        unknown = [dimension for dimension in dimensions if dimension not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown cube dimensions: {unknown}. Expected any of {list(DIMENSIONS)}.")
+        axes = tuple(axis for axis, dimension in enumerate(DIMENSIONS) if dimension not in dimensions)
+        return self.cells[flag].sum(axis=axes, dtype=np.int64)
+
+    def field_grids(self, flags=None, batter_ids=None, pitch_hands=None, pitch_types=None, counts=None, balls=None,
+                    strikes=None):
+        """
+        Return {flag: integer array of shape (players, ZONE_SLOTS)}, as expected by `zone_grids_from_field_grids`,
+        over the slice given by the filters of `select`.
+        """
+        indices = self._indices(batter_ids, pitch_hands, pitch_types, counts, balls, strikes)
+        grids = {}
+        for flag in (self.cells if flags is None else flags):
+            cell = self.cells[flag]
+            # Taking the selected slices before summing only touches the cells of the answer
+            for axis, axis_indices in enumerate(indices):
+                if axis_indices is not None:
+                    cell = np.take(cell, axis_indices, axis=axis)
+            grids[flag] = cell.sum(axis=(1, 2, 3), dtype=np.int64)
+        return grids
+
+    def zone_grids(self, metrics=None, view='catcher', **filters):
+        """
+        Compute a ZoneGrid per metric over a slice of the cube.
+
+        Takes the filters of `select` as keyword arguments, e.g. zone_grids(pitch_hands='L', strikes=2).
+
+        Returns:
+        - dict: {metric: ZoneGrid}
+
+        Raises:
+        - ValueError: If an unknown metric or view is requested, or the cube lacks a metric's counters.
+        """
+        metrics = _validate_metrics(metrics)
+        if view not in VIEWS:
+            raise ValueError(f"view should be one of {VIEWS}.")
+        flags = metric_flags(metrics)
+        missing = [flag for flag in flags if flag not in self.cells]
+        if missing:
+            raise ValueError(f"The cube was built without the counters {missing}.")
+
+        batter_ids = filters.get('batter_ids')
+        player_ids = self.player_ids if batter_ids is None else _as_list(batter_ids)
+        return zone_grids_from_field_grids(self.field_grids(flags, **filters), player_ids, metrics, view)
+
+    def save(self, path):
+        """
+        Write the cube to a compressed .npz file.
+        """
+        arrays = {f'cells_{flag}': cell for flag, cell in self.cells.items()}
+        np.savez_compressed(path, player_ids=np.asarray(self.player_ids, dtype=np.int64),
+                            pitch_types=np.asarray(self.pitch_types, dtype=str), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            cells = {name[len('cells_'):]: data[name] for name in data.files if name.startswith('cells_')}
+            return cls(data['player_ids'].tolist(), data['pitch_types'].tolist(), cells)
+
+
+def build_zone_cube(table, player_ids, metrics=None):
+    """
+    Aggregate a pitch table (see `build_pitch_table`) into a ZoneCube.
+
+    Parameters:
+    - table (pandas.DataFrame): Pitch table.
+    - player_ids (list): Batters of the cube, in this order. Pitches of other batters are ignored.
+    - metrics (list): Optional. Names from `ZONE_METRICS` whose counters the cube holds. Defaults to every metric.
+    """
+    flags = metric_flags(_validate_metrics(metrics))
+    player_ids = list(player_ids)
+    pitch_types = sorted(value for value in table['pitch_type'].cat.categories)
+
+    batters = _positions(player_ids, table['batter'])
+    hands = _positions(PITCH_HANDS, table['pitch_hand'])
+    types = _positions(pitch_types, table['pitch_type'])
+    counts = _count_positions(table['balls_before'], table['strikes_before'])
+    zones = table['zone'].to_numpy().astype(np.int64)
+
+    shape = (len(player_ids), len(PITCH_HANDS) + 1, len(pitch_types) + 1, len(COUNTS) + 1, ZONE_SLOTS)
+    valid = (batters < len(player_ids)) & (zones >= 0) & (zones < ZONE_SLOTS)
+    keys = np.ravel_multi_index((batters[valid], hands[valid], types[valid], counts[valid], zones[valid]), shape)
+
+    table_flags = pitch_flags(table)
+    size = int(np.prod(shape))
+    cells = {flag: np.bincount(keys, weights=np.asarray(table_flags[flag])[valid], minlength=size)
+             .round().astype(np.int64).reshape(shape)
+             for flag in flags}
+    return ZoneCube(player_ids, pitch_types, cells)
+
+
+def compute_zone_cube(lineup_ids, metrics=None, last_n_days=10, from_date=None, last_n_pks=5,
+                      max_workers=1, requests_per_second=None, discovery='schedule'):
+    """
+    Build the ZoneCube of a lineup over their last games.
+
+    Takes the same parameters as `compute_zone_metrics`.
+
+    Returns:
+    - ZoneCube: Counts of every requested metric, ready to be sliced with `ZoneCube.zone_grids`.
+    """
+    metrics = _validate_metrics(metrics)
+    player_ids, table = load_lineup_window(lineup_ids, last_n_days, from_date, last_n_pks,
+                                           max_workers, requests_per_second, discovery)
+    return build_zone_cube(table, player_ids, metrics)
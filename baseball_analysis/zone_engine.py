@@ -0,0 +1,368 @@
+import logging
+
+import numpy as np
+
+from .data_fetch import PITCHERS_POV_ZONES
+from .data_fetch import _check_discovery
+from .data_fetch import find_lineup_games
+from .data_fetch import get_data_source
+from .data_fetch import load_indexed_game
+from .data_fetch import remap_zone_number_to_coordinates
+from .instrumentation import count
+from .instrumentation import log
+from .instrumentation import stage
+from .pitch_table import build_pitch_table
+from .pitch_table import pitch_flags
+from .pitch_table import zone_bincount
+
+# Zone numbers used by the Stats API: 1-9 inside the strike zone, 11-14 outside of it
+STRIKE_ZONES = (1, 2, 3, 4, 5, 6, 7, 8, 9)
+ALL_ZONES = STRIKE_ZONES + (11, 12, 13, 14)
+
+
+# Every zone metric: the zones it covers, its counters with the pitch flag (see `pitch_flags`) summed into
+# each of them, the counters added up into its numerator and denominator, and the value reported for
+# zones with an empty denominator (None leaves the zone out)
+ZONE_METRICS = {
+    'swing_and_miss_rate': {
+        'zones': ALL_ZONES,
+        'fields': {'swings': 'swing', 'misses': 'miss'},
+        'numerator': ('misses',),
+        'denominator': ('swings',),
+        'empty_value': 0.0,
+    },
+    'called_strike_rate': {
+        'zones': STRIKE_ZONES,
+        'fields': {'called_strikes': 'called_strike', 'total_pitches': 'pitch'},
+        'numerator': ('called_strikes',),
+        'denominator': ('total_pitches',),
+        'empty_value': 0.0,
+    },
+    'slugging_percentage': {
+        'zones': ALL_ZONES,
+        'fields': {'total_bases': 'total_bases', 'at_bats': 'at_bat'},
+        'numerator': ('total_bases',),
+        'denominator': ('at_bats',),
+        'empty_value': 0.0,
+    },
+    'on_base_percentage': {
+        'zones': ALL_ZONES,
+        'fields': {'at_bats': 'at_bat', 'hits': 'hit', 'walks': 'walk', 'hbp': 'hbp', 'sf': 'sac_fly'},
+        'numerator': ('hits', 'walks', 'hbp'),
+        'denominator': ('at_bats', 'walks', 'hbp', 'sf'),
+        'empty_value': 0.0,
+    },
+    'batting_average': {
+        'zones': ALL_ZONES,
+        'fields': {'at_bats': 'at_bat', 'hits': 'hit'},
+        'numerator': ('hits',),
+        'denominator': ('at_bats',),
+        'empty_value': None,
+    },
+}
+
+VIEWS = ('catcher', 'pitcher')
+
+
+class ZoneGrid:
+    """
+    Compact, array-backed result of one zone metric for several players.
+
+    `numerators` and `denominators` are integer arrays of shape (players, zones): row i belongs to
+    `player_ids[i]` and column j to `zones[j]`. `view` tells whether zone numbers are in the
+    catcher's or the pitcher's view. Values are derived from the counts on demand.
+    """
+    __slots__ = ('metric', 'player_ids', 'zones', 'numerators', 'denominators', 'view')
+
+    def __init__(self, metric, player_ids, zones, numerators, denominators, view='catcher'):
+        if view not in VIEWS:
+            raise ValueError(f"view should be one of {VIEWS}.")
+        self.metric = metric
+        self.player_ids = tuple(player_ids)
+        self.zones = tuple(zones)
+        self.numerators = np.asarray(numerators, dtype=np.int64)
+        self.denominators = np.asarray(denominators, dtype=np.int64)
+        self.view = view
+
+    def __repr__(self):
+        return f"ZoneGrid({self.metric!r}, players={len(self.player_ids)}, view={self.view!r})"
+
+    def _rate(self, numerator, denominator):
+        if denominator > 0:
+            return round(int(numerator) / int(denominator), 3)
+        return ZONE_METRICS[self.metric]['empty_value']
+
+    def value(self, player_id, zone):
+        row = self.player_ids.index(player_id)
+        column = self.zones.index(zone)
+        return self._rate(self.numerators[row, column], self.denominators[row, column])
+
+    def to_dict(self):
+        """
+        Return {player_id: {zone: value}}, the format of `compute_zone_metrics`.
+        """
+        numerators = self.numerators.tolist()
+        denominators = self.denominators.tolist()
+        result = {}
+        for row, player_id in enumerate(self.player_ids):
+            zone_values = {}
+            for column, zone in enumerate(self.zones):
+                value = self._rate(numerators[row][column], denominators[row][column])
+                if value is not None:
+                    zone_values[zone] = value
+            result[player_id] = zone_values
+        return result
+
+    def to_view(self, view):
+        """
+        Return the grid with zone numbers in the catcher's or the pitcher's view.
+        """
+        if view not in VIEWS:
+            raise ValueError(f"view should be one of {VIEWS}.")
+        if view == self.view:
+            return self
+        # Mirroring the zones is its own inverse, so the same mapping works both ways
+        zones = [PITCHERS_POV_ZONES[zone] for zone in self.zones]
+        return ZoneGrid(self.metric, self.player_ids, zones, self.numerators, self.denominators, view)
+
+    def to_plot_data(self):
+        """
+        Return the values keyed by plot coordinates in the pitcher's view, as expected by
+        `visualize_strike_zone` and `render_strike_zones`.
+        """
+        return remap_zone_number_to_coordinates(self.to_view('pitcher').to_dict())
+
+    def to_serializable(self):
+        return {
+            'metric': self.metric,
+            'view': self.view,
+            'player_ids': list(self.player_ids),
+            'zones': list(self.zones),
+            'numerators': self.numerators.tolist(),
+            'denominators': self.denominators.tolist(),
+        }
+
+    @classmethod
+    def from_serializable(cls, data):
+        zone_count = len(data['zones'])
+        shape = (len(data['player_ids']), zone_count)
+        return cls(data['metric'], data['player_ids'], data['zones'],
+                   np.asarray(data['numerators'], dtype=np.int64).reshape(shape),
+                   np.asarray(data['denominators'], dtype=np.int64).reshape(shape), data['view'])
+
+
+def _validate_metrics(metrics):
+    if metrics is None:
+        return list(ZONE_METRICS)
+
+    unknown = [metric for metric in metrics if metric not in ZONE_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown zone metrics: {unknown}. Expected any of {list(ZONE_METRICS)}.")
+    return list(metrics)
+
+
+def load_lineup_table(player_games, games=None):
+    """
+    Build the pitch table of every player over their own games.
+
+    Parameters:
+    - player_games (dict): Mapping of player ID to the gamepks to consider for that player,
+      as returned by `get_last_n_gamepks_of_lineup`.
+    - games (dict): Optional. Already loaded {gamepk: IndexedGame}; missing games are fetched.
+
+    Raises:
+    - GameFetchError: If a missing game cannot be downloaded.
+    """
+    games = games or {}
+
+    players_by_game = {}
+    for player_id, gamepks in player_games.items():
+        for gamepk in gamepks:
+            players_by_game.setdefault(gamepk, []).append(player_id)
+
+    game_batters = []
+    for gamepk, players in players_by_game.items():
+        indexed_game = games.get(gamepk)
+        if indexed_game is None:
+            indexed_game = load_indexed_game(gamepk)
+
+        if not indexed_game.has_plays:
+            log(logging.WARNING, 'event_scan', "No play data found for game %s", gamepk, gamepk=gamepk)
+            continue
+
+        game_batters.append((indexed_game, players))
+
+    with stage('event_scan'):
+        table = build_pitch_table(game_batters)
+    count('games_scanned', len(game_batters), stage='event_scan')
+    count('events_scanned', len(table), stage='event_scan')
+    return table
+
+
+def metric_flags(metrics):
+    """
+    Return the pitch flags (see `pitch_flags`) summed into the counters of the metrics, without duplicates.
+    """
+    flags = []
+    for metric in metrics:
+        for flag in ZONE_METRICS[metric]['fields'].values():
+            if flag not in flags:
+                flags.append(flag)
+    return flags
+
+
+def field_grids(table, player_ids, flags):
+    """
+    Sum each pitch flag once per (player, zone).
+
+    Returns:
+    - dict: {flag: integer array of shape (len(player_ids), ZONE_SLOTS)}
+    """
+    with stage('aggregate'):
+        table_flags = pitch_flags(table)
+        return {flag: zone_bincount(table, player_ids, table_flags[flag]) for flag in flags}
+
+
+def count_zone_metrics(player_games, metrics=None, games=None):
+    """
+    Flatten the games of every player into one pitch table and fill the zone counters of all
+    requested metrics with vectorized aggregation.
+
+    Parameters:
+    - player_games (dict): Mapping of player ID to the gamepks to consider for that player,
+      as returned by `get_last_n_gamepks_of_lineup`.
+    - metrics (list): Optional. Names from `ZONE_METRICS`. Defaults to every metric.
+    - games (dict): Optional. Already loaded {gamepk: IndexedGame}; missing games are fetched.
+
+    Returns:
+    - dict: {metric: {player_id: {zone: {counter: value}}}}
+    """
+    metrics = _validate_metrics(metrics)
+    return count_table_zone_metrics(load_lineup_table(player_games, games), list(player_games), metrics)
+
+
+def count_table_zone_metrics(table, player_ids, metrics=None):
+    """
+    Fill the zone counters of the requested metrics from a pitch table (see `build_pitch_table`).
+
+    Returns:
+    - dict: {metric: {player_id: {zone: {counter: value}}}}
+    """
+    metrics = _validate_metrics(metrics)
+    grids = field_grids(table, player_ids, metric_flags(metrics))
+
+    counts = {}
+    for metric in metrics:
+        spec = ZONE_METRICS[metric]
+        counts[metric] = {
+            player_id: {zone: {field: int(grids[flag][row, zone]) for field, flag in spec['fields'].items()}
+                        for zone in spec['zones']}
+            for row, player_id in enumerate(player_ids)
+        }
+    return counts
+
+
+def zone_grids_from_table(table, player_ids, metrics=None, view='catcher'):
+    """
+    Compute a ZoneGrid per requested metric from a pitch table.
+
+    Returns:
+    - dict: {metric: ZoneGrid}
+    """
+    metrics = _validate_metrics(metrics)
+    player_ids = list(player_ids)
+    return zone_grids_from_field_grids(field_grids(table, player_ids, metric_flags(metrics)), player_ids,
+                                       metrics, view)
+
+
+def zone_grids_from_field_grids(grids, player_ids, metrics=None, view='catcher'):
+    """
+    Compute a ZoneGrid per requested metric from per-(player, zone) flag sums (see `field_grids`).
+
+    Returns:
+    - dict: {metric: ZoneGrid}
+    """
+    metrics = _validate_metrics(metrics)
+    player_ids = list(player_ids)
+
+    zone_grids = {}
+    for metric in metrics:
+        spec = ZONE_METRICS[metric]
+        columns = list(spec['zones'])
+        metric_grids = {field: grids[flag][:, columns] for field, flag in spec['fields'].items()}
+        numerators = sum(metric_grids[field] for field in spec['numerator'])
+        denominators = sum(metric_grids[field] for field in spec['denominator'])
+        zone_grids[metric] = ZoneGrid(metric, player_ids, spec['zones'], numerators, denominators).to_view(view)
+    return zone_grids
+
+
+def load_lineup_window(lineup_ids, last_n_days=10, from_date=None, last_n_pks=5,
+                       max_workers=1, requests_per_second=None, discovery='schedule'):
+    """
+    Build the pitch table of each lineup player's last games in the date window.
+
+    The pitches are read from the installed data source (see `set_data_source`) when there is one,
+    otherwise the games are discovered and downloaded from the Stats API.
+
+    Returns:
+    - tuple: (player IDs, pitch table)
+    """
+    source = get_data_source()
+    if source is not None:
+        _check_discovery(discovery)
+        return source.lineup_table(lineup_ids, last_n_days, from_date, last_n_pks)
+
+    player_games, games = find_lineup_games(lineup_ids, last_n_days, from_date, last_n_pks,
+                                            max_workers, requests_per_second, discovery)
+    return list(player_games), load_lineup_table(player_games, games)
+
+
+def compute_zone_grids(lineup_ids, metrics=None, last_n_days=10, from_date=None, last_n_pks=5,
+                       max_workers=1, requests_per_second=None, discovery='schedule', view='catcher'):
+    """
+    Calculate several zone metrics for a lineup without plotting anything.
+
+    Takes the same parameters as `compute_zone_metrics`, plus:
+    - view (str): 'catcher' or 'pitcher', the view the zone numbers are reported in. Default is 'catcher'.
+
+    Returns:
+    - dict: {metric: ZoneGrid} holding per-player, per-zone values with their numerators and denominators.
+
+    Raises:
+    - ValueError: If an unknown metric, discovery mode or view is requested.
+    """
+    metrics = _validate_metrics(metrics)
+    if view not in VIEWS:
+        raise ValueError(f"view should be one of {VIEWS}.")
+
+    player_ids, table = load_lineup_window(lineup_ids, last_n_days, from_date, last_n_pks,
+                                           max_workers, requests_per_second, discovery)
+    return zone_grids_from_table(table, player_ids, metrics, view)
+
+
+def compute_zone_metrics(lineup_ids, metrics=None, last_n_days=10, from_date=None, last_n_pks=5,
+                         max_workers=1, requests_per_second=None, discovery='schedule'):
+    """
+    Calculate several zone metrics for a lineup with a single scan of each game.
+
+    Parameters:
+    - lineup_ids (list): A list of MLB player IDs representing the lineup.
+    - metrics (list): Optional. Names from `ZONE_METRICS`, e.g. ['swing_and_miss_rate', 'batting_average'].
+      Defaults to every metric.
+    - last_n_days (int): Number of days back from 'from_date' param to consider for games. Default is 10 days.
+    - from_date (str): Optional. Start date in 'YYYY-MM-DD' format. If not provided, defaults to today's date.
+    - last_n_pks (int): Number of recent games to consider for each player. Default is 5 games.
+    - max_workers (int): Number of games of the date window downloaded concurrently. Default is 1.
+    - requests_per_second (float): Optional. Upper bound on the request rate while downloading games.
+    - discovery (str): 'schedule' to scan the league-wide schedule, or 'team' to only look at the
+      schedules of the players' teams. Default is 'schedule'.
+
+    Returns:
+    - dict: {metric: {player_id: {zone: value}}} with zones in the catcher's view.
+
+    Raises:
+    - ValueError: If an unknown metric or discovery mode is requested.
+    """
+    zone_grids = compute_zone_grids(lineup_ids, metrics, last_n_days, from_date, last_n_pks,
+                                    max_workers, requests_per_second, discovery)
+    return {metric: zone_grid.to_dict() for metric, zone_grid in zone_grids.items()}
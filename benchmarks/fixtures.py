@@ -0,0 +1,302 @@
+"""
+Recorded Stats API fixtures and an offline stand-in that replays them.
+
+A fixture directory holds:
+- schedule.json: the list returned by `statsapi.schedule` for the recorded window
+- playByPlay/<gamePk>.json: the `game_playByPlay` document of every scheduled game
+- register.json: Chadwick register rows (key_mlbam, name_first, name_last) of the players involved
+
+Fixtures are recorded from the live API with `record_fixtures`, or generated with
+`generate_fixtures` when no network is available.
+"""
+import json
+import os
+import random
+from collections import Counter
+from datetime import date, timedelta
+from unittest import mock
+
+PITCH_OUTCOMES = [
+    # (description, call code, weight)
+    ('Ball', 'B', 34),
+    ('Called Strike', 'C', 16),
+    ('Swinging Strike', 'S', 10),
+    ('Swinging Strike (Blocked)', 'W', 1),
+    ('Foul', 'F', 17),
+    ('Foul Tip', 'T', 1),
+    ('In play, out(s)', 'X', 12),
+    ('In play, no out', 'D', 5),
+    ('In play, run(s)', 'E', 3),
+    ('Hit By Pitch', 'H', 1),
+]
+HIT_EVENTS = ['Single', 'Single', 'Single', 'Double', 'Triple', 'Home Run']
+OUT_EVENTS = ['Groundout', 'Flyout', 'Lineout', 'Pop Out']
+ZONES = [1, 2, 3, 4, 5, 6, 7, 8, 9, 11, 12, 13, 14]
+PITCH_TYPES = ['FF', 'SI', 'SL', 'CH', 'CU', 'FC']
+
+# Statcast names of the synthetic calls and events, for the `download_statcast` stand-in
+STATCAST_DESCRIPTIONS = {'B': 'ball', 'C': 'called_strike', 'S': 'swinging_strike', 'W': 'swinging_strike_blocked',
+                         'F': 'foul', 'T': 'foul_tip', 'X': 'hit_into_play', 'D': 'hit_into_play',
+                         'E': 'hit_into_play', 'H': 'hit_by_pitch'}
+STATCAST_EVENTS = {'Single': 'single', 'Double': 'double', 'Triple': 'triple', 'Home Run': 'home_run',
+                   'Groundout': 'field_out', 'Flyout': 'field_out', 'Lineout': 'field_out', 'Pop Out': 'field_out',
+                   'Walk': 'walk', 'Strikeout': 'strikeout', 'Hit By Pitch': 'hit_by_pitch'}
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+
+
+def _synthetic_plate_appearance(rng, at_bat_index, half_inning, batter, pitcher, pitch_hand, bat_side):
+    events = []
+    balls = strikes = 0
+    result_event = None
+    while result_event is None:
+        description, code, _ = rng.choices(PITCH_OUTCOMES, weights=[o[2] for o in PITCH_OUTCOMES])[0]
+        zone = rng.choice(ZONES)
+        column, row = (ZONES.index(zone) % 3, ZONES.index(zone) // 3) if zone < 10 else (rng.choice((-1, 3)), rng.choice((-1, 3)))
+        if code == 'B':
+            balls += 1
+        elif code in 'CSWT' or (code == 'F' and strikes < 2):
+            strikes += 1
+
+        in_play = code in 'XDE'
+        events.append({
+            'isPitch': True,
+            'index': len(events),
+            'details': {
+                'description': description,
+                'call': {'code': code, 'description': description},
+                'isInPlay': in_play,
+                'isStrike': code in 'CSWTFX',
+                'isBall': code == 'B',
+                'isOut': code == 'X',
+                'type': {'code': rng.choice(PITCH_TYPES)},
+            },
+            'count': {'balls': balls, 'strikes': strikes, 'outs': 0},
+            'pitchData': {
+                'zone': zone,
+                'startSpeed': round(rng.uniform(78, 99), 1),
+                'coordinates': {'pX': round((column - 1) * 0.55 + rng.uniform(-0.27, 0.27), 3),
+                                'pZ': round(2.5 + (1 - row) * 0.6 + rng.uniform(-0.3, 0.3), 3)},
+            },
+        })
+
+        if in_play:
+            result_event = rng.choice(OUT_EVENTS) if code == 'X' else rng.choice(HIT_EVENTS)
+        elif code == 'H':
+            result_event = 'Hit By Pitch'
+        elif balls == 4:
+            result_event = 'Walk'
+        elif strikes == 3:
+            result_event = 'Strikeout'
+
+    return {
+        'result': {'type': 'atBat', 'event': result_event, 'rbi': 0},
+        'about': {'atBatIndex': at_bat_index, 'halfInning': half_inning, 'isComplete': True},
+        'matchup': {'batter': {'id': batter}, 'pitcher': {'id': pitcher},
+                    'batSide': {'code': bat_side}, 'pitchHand': {'code': pitch_hand}},
+        'playEvents': events,
+    }
+
+
+def _synthetic_game(rng, home_batters, away_batters, home_pitcher, away_pitcher):
+    plays = []
+    lineups = {'top': [away_batters, 0, home_pitcher], 'bottom': [home_batters, 0, away_pitcher]}
+    for _ in range(9):
+        for half_inning in ('top', 'bottom'):
+            batters, position, pitcher = lineups[half_inning]
+            for _ in range(rng.randint(3, 6)):
+                batter = batters[position % len(batters)]
+                position += 1
+                plays.append(_synthetic_plate_appearance(rng, len(plays), half_inning, batter, pitcher,
+                                                         'R' if pitcher % 3 else 'L', 'L' if batter % 4 == 0 else 'R'))
+            lineups[half_inning][1] = position
+    return {'allPlays': plays, 'currentPlay': plays[-1], 'scoringPlays': [], 'playsByInning': []}
+
+
+def generate_fixtures(directory, start_date='2023-06-01', days=10, teams=30, seed=0):
+    """
+    Write a synthetic fixture directory: every team plays once per day against a rotating opponent.
+
+    Team ids run from 101; the nine batters of team t have ids t * 1000 + 1 to t * 1000 + 9.
+    """
+    rng = random.Random(seed)
+    first_day = date.fromisoformat(start_date)
+    team_ids = [101 + team for team in range(teams)]
+    batters = {team_id: [team_id * 1000 + i for i in range(1, 10)] for team_id in team_ids}
+
+    schedule = []
+    game_pk = 700000
+    for day in range(days):
+        game_date = (first_day + timedelta(days=day)).isoformat()
+        order = team_ids[:]
+        rng.shuffle(order)
+        for away_id, home_id in zip(order[::2], order[1::2]):
+            game_pk += 1
+            schedule.append({'game_id': game_pk, 'game_date': game_date, 'game_datetime': f"{game_date}T23:05:00Z",
+                             'status': 'Final', 'away_id': away_id, 'home_id': home_id})
+            game = _synthetic_game(rng, batters[home_id], batters[away_id], home_id * 1000 + 50, away_id * 1000 + 50)
+            _write_json(os.path.join(directory, 'playByPlay', f"{game_pk}.json"), game)
+
+    _write_json(os.path.join(directory, 'schedule.json'), schedule)
+    register = [{'key_mlbam': player_id, 'name_first': f"Player{player_id}", 'name_last': f"Team{team_id}"}
+                for team_id, player_ids in batters.items() for player_id in player_ids]
+    _write_json(os.path.join(directory, 'register.json'), register)
+    return directory
+
+
+def record_fixtures(directory, start_date, end_date):
+    """
+    Record the live schedule and play-by-play of a date window into a fixture directory.
+    """
+    import statsapi
+
+    schedule = statsapi.schedule(start_date=start_date, end_date=end_date)
+    _write_json(os.path.join(directory, 'schedule.json'), schedule)
+
+    batter_ids = set()
+    for game in schedule:
+        game_data = statsapi.get('game_playByPlay', {'gamePk': game['game_id']})
+        _write_json(os.path.join(directory, 'playByPlay', f"{game['game_id']}.json"), game_data)
+        batter_ids.update(play['matchup']['batter']['id'] for play in game_data.get('allPlays', []))
+
+    import pybaseball
+
+    register = pybaseball.chadwick_register()
+    register = register[register['key_mlbam'].isin(batter_ids)]
+    rows = [{'key_mlbam': int(row.key_mlbam), 'name_first': row.name_first, 'name_last': row.name_last}
+            for row in register.itertuples()]
+    _write_json(os.path.join(directory, 'register.json'), rows)
+    return directory
+
+
+def _statcast_rows(game, game_data):
+    rows = []
+    for play in game_data.get('allPlays', []):
+        events = [event for event in play.get('playEvents', []) if event.get('isPitch')]
+        balls = strikes = 0
+        for number, event in enumerate(events, start=1):
+            code = event['details']['call']['code']
+            coordinates = event.get('pitchData', {}).get('coordinates', {})
+            rows.append({
+                'game_date': game['game_date'], 'game_pk': game['game_id'],
+                'at_bat_number': play['about']['atBatIndex'] + 1, 'pitch_number': number,
+                'batter': play['matchup']['batter']['id'], 'pitcher': play['matchup']['pitcher']['id'],
+                'zone': event.get('pitchData', {}).get('zone'), 'description': STATCAST_DESCRIPTIONS[code],
+                'events': STATCAST_EVENTS.get(play['result']['event']) if number == len(events) else None,
+                'balls': balls, 'strikes': strikes, 'p_throws': play['matchup']['pitchHand']['code'],
+                'pitch_type': event['details'].get('type', {}).get('code'),
+                'plate_x': coordinates.get('pX'), 'plate_z': coordinates.get('pZ'),
+                'bat_score': 0, 'post_bat_score': 1 if code == 'E' else 0,
+            })
+            balls, strikes = event['count']['balls'], event['count']['strikes']
+    return rows
+
+
+def _live_feed(game_data):
+    # Final live feed of a recorded game: its plays and both batting orders, in order of first plate appearance
+    batting_orders = {'away': [], 'home': []}
+    for play in game_data.get('allPlays', []):
+        team = 'away' if play['about']['halfInning'] == 'top' else 'home'
+        batter = play['matchup']['batter']['id']
+        if batter not in batting_orders[team] and len(batting_orders[team]) < 9:
+            batting_orders[team].append(batter)
+    return {
+        'gameData': {'status': {'abstractGameState': 'Final'}},
+        'liveData': {'plays': game_data,
+                     'boxscore': {'teams': {team: {'battingOrder': order} for team, order in batting_orders.items()}}},
+    }
+
+
+class FixtureReplay:
+    """
+    Serve a fixture directory in place of the package's transport (see `set_transport`), the Statcast
+    download and the player register.
+
+    Documents are kept as JSON text and decoded on every request, like a real response would be. The
+    live `game` feed of a recorded game is derived from its play-by-play.
+    `requests` counts the calls per endpoint and `bytes` the JSON bytes served.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'schedule.json'), encoding='utf-8') as f:
+            self.schedule_entries = json.load(f)
+        self.documents = {}
+        pbp_directory = os.path.join(directory, 'playByPlay')
+        for name in os.listdir(pbp_directory):
+            with open(os.path.join(pbp_directory, name), encoding='utf-8') as f:
+                self.documents[int(name.split('.')[0])] = f.read()
+        with open(os.path.join(directory, 'register.json'), encoding='utf-8') as f:
+            self.register_rows = json.load(f)
+
+        self.requests = Counter()
+        self.bytes = 0
+        self._patches = []
+
+    def reset_counters(self):
+        self.requests = Counter()
+        self.bytes = 0
+
+    def get(self, endpoint, params=None, force=False, **kwargs):
+        params = params or {}
+        self.requests[endpoint] += 1
+        if endpoint not in ('game_playByPlay', 'game'):
+            raise ValueError(f"Endpoint {endpoint} is not recorded in {self.directory}")
+
+        text = self.documents[int(params['gamePk'])]
+        if endpoint == 'game':
+            text = json.dumps(_live_feed(json.loads(text)), separators=(',', ':'))
+        self.bytes += len(text)
+        return json.loads(text)
+
+    def schedule(self, date=None, start_date=None, end_date=None, team='', **kwargs):
+        self.requests['schedule'] += 1
+        start_date = start_date or date
+        end_date = end_date or date
+        games = [game for game in self.schedule_entries
+                 if start_date <= game['game_date'] <= end_date
+                 and (not team or int(team) in (game['home_id'], game['away_id']))]
+        self.bytes += len(json.dumps(games))
+        return games
+
+    def statcast(self, start_date, end_date):
+        """
+        Stand-in for `download_statcast`: the scheduled games of the window as Statcast rows.
+        """
+        import pandas as pd
+
+        from baseball_analysis.statcast import STATCAST_COLUMNS
+
+        self.requests['statcast'] += 1
+        rows = []
+        for game in self.schedule_entries:
+            if start_date.isoformat() <= game['game_date'] <= end_date.isoformat():
+                rows.extend(_statcast_rows(game, json.loads(self.documents[game['game_id']])))
+        frame = pd.DataFrame(rows, columns=list(STATCAST_COLUMNS))
+        self.bytes += len(frame.to_csv(index=False))
+        return frame
+
+    def __enter__(self):
+        import pandas as pd
+
+        from baseball_analysis import data_fetch
+        from baseball_analysis import player_ids
+
+        register = pd.DataFrame(self.register_rows, columns=['key_mlbam', 'name_first', 'name_last'])
+        self._patches = [
+            mock.patch.object(data_fetch, '_transport', self),
+            mock.patch('baseball_analysis.statcast.download_statcast', self.statcast),
+            mock.patch.object(player_ids, '_index', player_ids.PlayerIdIndex(register)),
+        ]
+        for patch in self._patches:
+            patch.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        for patch in reversed(self._patches):
+            patch.stop()
+        self._patches = []
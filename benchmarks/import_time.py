@@ -0,0 +1,57 @@
+"""
+Import-time budget for `import baseball_analysis`.
+
+Runs the import in fresh interpreters and fails (exit code 1) when the best time exceeds the
+budget or when a heavy dependency gets imported eagerly again.
+
+    python benchmarks/import_time.py [--budget 0.05] [--runs 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be loaded by a bare `import baseball_analysis`
+HEAVY_MODULES = ('matplotlib', 'pybaseball', 'mlbstatsapi', 'statsapi', 'pandas', 'numpy')
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import baseball_analysis
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_import(runs):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get('PYTHONPATH')])))
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', PROBE], env=env, check=True,
+                                capture_output=True, text=True).stdout
+        results.append(json.loads(output))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget', type=float, default=0.05, help='maximum import time in seconds')
+    parser.add_argument('--runs', type=int, default=5, help='number of fresh interpreters to time')
+    args = parser.parse_args(argv)
+
+    results = measure_import(args.runs)
+    best = min(result['seconds'] for result in results)
+    loaded = sorted({module for result in results for module in result['loaded']})
+
+    print(f"import baseball_analysis: best {best * 1000:.1f} ms over {args.runs} runs (budget {args.budget * 1000:.0f} ms)")
+    if loaded:
+        print(f"eagerly imported heavy modules: {', '.join(loaded)}")
+
+    return 0 if best <= args.budget and not loaded else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
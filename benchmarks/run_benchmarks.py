@@ -0,0 +1,146 @@
+"""
+Offline benchmarks of the lineup pipeline against recorded (or synthetic) Stats API fixtures.
+
+    python benchmarks/run_benchmarks.py                      # synthetic fixtures, lineup scale
+    python benchmarks/run_benchmarks.py --scale slate --scale season
+    python benchmarks/run_benchmarks.py --fixtures path/to/recorded --from-date 2023-06-16
+
+Every case reports wall time, peak traced memory and the number of requests and bytes served by
+the stand-in. Wall time and memory come from two separate runs so tracing does not skew timings.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(BENCHMARK_DIR), BENCHMARK_DIR]
+
+from fixtures import FixtureReplay, generate_fixtures  # noqa: E402
+
+import baseball_analysis  # noqa: E402
+from baseball_analysis import data_fetch, visualization  # noqa: E402
+
+METRIC_FUNCTIONS = [
+    'get_swing_and_miss_rate_by_zone',
+    'get_called_strike_rate_by_zone',
+    'get_slugging_percentage_by_zone',
+    'get_on_base_percentage_by_zone',
+    'get_batting_average_by_zone',
+]
+
+# (days of history in the window, games kept per player) for each scale
+SCALES = {
+    'lineup': (10, 5),
+    'slate': (10, 5),
+    'season': (180, 162),
+}
+
+
+def _lineups(replay, from_date, count):
+    # Batting orders of the teams playing on the last recorded day before `from_date`,
+    # taken from the order batters first come up in each half-inning
+    last_day = max(game['game_date'] for game in replay.schedule_entries if game['game_date'] < from_date)
+    lineups = []
+    for game in replay.schedule_entries:
+        if game['game_date'] != last_day:
+            continue
+        document = replay.get('game_playByPlay', {'gamePk': game['game_id']})
+        for half_inning in ('top', 'bottom'):
+            batters = {}
+            for play in document['allPlays']:
+                if play['about'].get('halfInning') == half_inning:
+                    batters.setdefault(play['matchup']['batter']['id'])
+            lineups.append(list(batters)[:9])
+    replay.reset_counters()
+    return lineups[:count]
+
+
+def measure(replay, function):
+    replay.reset_counters()
+    start = time.perf_counter()
+    function()
+    wall = time.perf_counter() - start
+    requests = sum(replay.requests.values())
+    served = replay.bytes
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return wall, peak, requests, served
+
+
+def benchmark_cases(scale, lineups, from_date):
+    last_n_days, last_n_pks = SCALES[scale]
+    if scale != 'slate':
+        lineups = lineups[:1]
+
+    def for_lineups(function, **kwargs):
+        return lambda: [function(lineup, last_n_days, from_date, last_n_pks, **kwargs) for lineup in lineups]
+
+    cases = [('get_last_n_gamepks_of_lineup', for_lineups(data_fetch.get_last_n_gamepks_of_lineup))]
+    for name in METRIC_FUNCTIONS:
+        cases.append((name, for_lineups(getattr(baseball_analysis, name))))
+    cases.append(('compute_zone_metrics (all metrics)',
+                  lambda: [baseball_analysis.compute_zone_metrics(lineup, None, last_n_days, from_date, last_n_pks)
+                           for lineup in lineups]))
+
+    grids = [baseball_analysis.compute_batting_average_by_zone(lineup, last_n_days, from_date, last_n_pks)
+             for lineup in lineups]
+    cases.append(('visualize_strike_zone',
+                  lambda: [_visualize_batters(grid.to_plot_data()) for grid in grids]))
+    cases.append(('render_strike_zones',
+                  lambda: [visualization.render_strike_zones(grid.to_plot_data()) for grid in grids]))
+    return cases
+
+
+def _visualize_batters(plot_data):
+    import matplotlib.pyplot as plt
+
+    # Under Agg plt.show() leaves the figure open, so every batter would be drawn onto the same growing axes
+    for player_id, metrics in plot_data.items():
+        visualization.visualize_strike_zone({player_id: metrics})
+        plt.close('all')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixtures', help='fixture directory; synthetic fixtures are generated when omitted')
+    parser.add_argument('--scale', action='append', choices=list(SCALES),
+                        help='scale to run, may be repeated (default: lineup)')
+    parser.add_argument('--from-date', help="date the windows end before, 'YYYY-MM-DD'")
+    parser.add_argument('--lineups', type=int, default=30, help='number of lineups at slate scale')
+    args = parser.parse_args(argv)
+    scales = args.scale or ['lineup']
+
+    fixture_dir = args.fixtures
+    if fixture_dir is None:
+        days = max(SCALES[scale][0] for scale in scales)
+        fixture_dir = generate_fixtures(tempfile.mkdtemp(prefix='baseball_fixtures_'), days=days)
+        print(f"Generated {days} days of synthetic fixtures in {fixture_dir}")
+
+    with FixtureReplay(fixture_dir) as replay:
+        last_date = max(game['game_date'] for game in replay.schedule_entries)
+        from_date = args.from_date or _day_after(last_date)
+        lineups = _lineups(replay, from_date, args.lineups)
+
+        print(f"{'scale':<8} {'case':<38} {'wall s':>9} {'peak MiB':>9} {'requests':>9} {'MiB served':>11}")
+        for scale in scales:
+            for name, function in benchmark_cases(scale, lineups, from_date):
+                wall, peak, requests, served = measure(replay, function)
+                print(f"{scale:<8} {name:<38} {wall:>9.3f} {peak / 2 ** 20:>9.1f} {requests:>9} {served / 2 ** 20:>11.1f}")
+
+
+def _day_after(day):
+    from datetime import date, timedelta
+
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+
+if __name__ == '__main__':
+    main()
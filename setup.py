@@ -13,6 +13,7 @@ setup(
         'pybaseball',
         'pandas',
         'numpy',
+        'requests',
         'seaborn',
         'matplotlib',
     ],
@@ -0,0 +1,68 @@
+import gzip
+
+import pytest
+
+from baseball_analysis import cache as cache_module
+from baseball_analysis.cache import FileGameCache
+from baseball_analysis.cache import MemoryGameCache
+from baseball_analysis.cache import SQLiteGameCache
+from baseball_analysis.data_fetch import fetch_play_by_play
+from baseball_analysis.data_fetch import set_game_cache
+from baseball_analysis.data_fetch import set_transport
+
+DOCUMENT = {'allPlays': [{'about': {'isComplete': True}}]}
+
+
+@pytest.fixture(params=['memory', 'file', 'sqlite'])
+def game_cache(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryGameCache(live_ttl=60)
+    if request.param == 'file':
+        return FileGameCache(str(tmp_path / 'games'), live_ttl=60)
+    return SQLiteGameCache(str(tmp_path / 'games.sqlite'), live_ttl=60)
+
+
+def _later(monkeypatch, seconds):
+    now = cache_module.time.time()
+    monkeypatch.setattr(cache_module.time, 'time', lambda: now + seconds)
+
+
+def test_final_entries_never_expire(game_cache, monkeypatch):
+    game_cache.set(717465, DOCUMENT, final=True)
+    _later(monkeypatch, 10 ** 7)
+
+    assert game_cache.get(717465) == DOCUMENT
+
+
+def test_live_entries_expire_after_the_ttl(game_cache, monkeypatch):
+    game_cache.set(717465, DOCUMENT)
+    assert game_cache.get(717465) == DOCUMENT
+
+    _later(monkeypatch, 61)
+    assert game_cache.get(717465) is None
+
+
+class CountingTransport:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, endpoint, params):
+        self.calls += 1
+        return DOCUMENT
+
+
+@pytest.mark.parametrize('content', [b'not gzip', gzip.compress(b'{"allPlays": [')[:-8], gzip.compress(b'{')])
+def test_corrupt_file_falls_back_to_a_fresh_fetch(tmp_path, content):
+    game_cache = FileGameCache(str(tmp_path))
+    (tmp_path / '717465.final.json.gz').write_bytes(content)
+    transport = CountingTransport()
+    set_game_cache(game_cache)
+    set_transport(transport)
+    try:
+        assert fetch_play_by_play(717465, final=True) == DOCUMENT
+        assert fetch_play_by_play(717465, final=True) == DOCUMENT
+    finally:
+        set_transport(None)
+        set_game_cache(None)
+
+    assert transport.calls == 1
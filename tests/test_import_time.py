@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same budget as benchmarks/import_time.py
+BUDGET_SECONDS = 0.05
+
+HEAVY_MODULES = ('pandas', 'matplotlib', 'pybaseball', 'statsapi')
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import baseball_analysis
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def _import_in_fresh_interpreter():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get('PYTHONPATH')])))
+    output = subprocess.run([sys.executable, '-c', PROBE], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def test_import_does_not_load_heavy_dependencies():
+    assert _import_in_fresh_interpreter()['loaded'] == []
+
+
+def test_import_stays_within_budget():
+    # Best of a few runs, so a busy machine does not fail the test
+    best = min(_import_in_fresh_interpreter()['seconds'] for _ in range(3))
+    assert best <= BUDGET_SECONDS
@@ -0,0 +1,50 @@
+import io
+import json
+
+import requests
+
+from baseball_analysis import add_hook
+from baseball_analysis import remove_hook
+from baseball_analysis.cache import MemoryGameCache
+from baseball_analysis.data_fetch import fetch_play_by_play
+from baseball_analysis.data_fetch import set_game_cache
+from baseball_analysis.data_fetch import set_transport
+from baseball_analysis.transport import Transport
+
+
+class OneDocumentSession:
+    def __init__(self, document):
+        self.body = json.dumps(document).encode()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.body
+        response.raw = io.BytesIO(self.body)
+        response.url = url
+        return response
+
+
+def test_hook_receives_stage_and_counter_events():
+    document = {'allPlays': []}
+    client = Transport()
+    client.session = OneDocumentSession(document)
+    events = []
+    add_hook(events.append)
+    set_transport(client)
+    set_game_cache(MemoryGameCache())
+    try:
+        assert fetch_play_by_play(717465, final=True) == document
+        assert fetch_play_by_play(717465, final=True) == document
+    finally:
+        set_game_cache(None)
+        set_transport(None)
+        remove_hook(events.append)
+
+    stages = [(event['name'], event.get('endpoint')) for event in events if event['kind'] == 'stage']
+    counters = [(event['name'], event['value']) for event in events if event['kind'] == 'counter']
+    assert stages == [('decode', 'game_playByPlay'), ('play_by_play', None)]
+    assert all(event['value'] >= 0 for event in events if event['kind'] == 'stage')
+    assert [event['gamepk'] for event in events if event['name'] == 'play_by_play'] == [717465]
+    assert counters == [('cache_misses', 1), ('http_requests', 1), ('http_bytes', len(json.dumps(document))),
+                        ('cache_hits', 1)]
@@ -0,0 +1,124 @@
+import copy
+
+import pytest
+
+from baseball_analysis.data_fetch import set_transport
+from baseball_analysis.live import LiveZoneTracker
+from baseball_analysis.live import apply_json_patch
+
+
+def test_apply_json_patch_operations():
+    document = {'a': {'b': [1, 2]}, 'c': 'x'}
+    operations = [
+        {'op': 'add', 'path': '/a/b/1', 'value': 5},
+        {'op': 'add', 'path': '/a/b/-', 'value': 9},
+        {'op': 'remove', 'path': '/a/b/0'},
+        {'op': 'replace', 'path': '/c', 'value': 'y'},
+        {'op': 'copy', 'from': '/a/b', 'path': '/d'},
+        {'op': 'move', 'from': '/c', 'path': '/e'},
+        {'op': 'test', 'path': '/e', 'value': 'y'},
+    ]
+
+    patched = apply_json_patch(document, operations)
+
+    assert patched is document
+    assert patched == {'a': {'b': [5, 2, 9]}, 'd': [5, 2, 9], 'e': 'y'}
+    assert apply_json_patch(patched, [{'op': 'replace', 'path': '', 'value': {'new': 1}}]) == {'new': 1}
+
+
+def test_apply_json_patch_errors():
+    with pytest.raises(ValueError):
+        apply_json_patch({'a': 1}, [{'op': 'test', 'path': '/a', 'value': 2}])
+    with pytest.raises(ValueError):
+        apply_json_patch({'a': 1}, [{'op': 'merge', 'path': '/a'}])
+
+
+def _play(batter, complete=True):
+    pitch = {'isPitch': True, 'count': {'balls': 0, 'strikes': 1}, 'pitchData': {'zone': 5},
+             'details': {'call': {'code': 'S', 'description': 'Swinging Strike'},
+                         'description': 'Swinging Strike', 'type': {'code': 'FF'}}}
+    return {'matchup': {'batter': {'id': batter}, 'pitcher': {'id': 200}, 'pitchHand': {'code': 'R'}},
+            'result': {'type': 'atBat', 'event': 'Strikeout'}, 'about': {'isComplete': complete},
+            'playEvents': [pitch, copy.deepcopy(pitch)]}
+
+
+def _feed(plays, timecode, state='Live'):
+    return {'metaData': {'timeStamp': timecode}, 'gameData': {'status': {'abstractGameState': state}},
+            'liveData': {'plays': {'allPlays': plays}}}
+
+
+class LiveFeedServer:
+    def __init__(self, feed):
+        self.answers = {'game': feed}
+        self.calls = []
+
+    def get(self, endpoint, params):
+        self.calls.append(endpoint)
+        return copy.deepcopy(self.answers[endpoint])
+
+
+@pytest.fixture
+def server():
+    server = LiveFeedServer(_feed([_play(100), _play(101, complete=False)], 't1'))
+    set_transport(server)
+    yield server
+    set_transport(None)
+
+
+def _pitches(tracker, batter):
+    return int(tracker.partial.select([batter]).grids['pitch'].sum())
+
+
+def test_first_poll_counts_completed_plays(server):
+    tracker = LiveZoneTracker(717465)
+
+    assert tracker.poll() == 1
+    assert tracker.processed_plays == 1
+    assert (_pitches(tracker, 100), _pitches(tracker, 101)) == (2, 0)
+    assert tracker.timecode == 't1'
+
+
+def test_poll_applies_the_diff_patch_and_counts_new_plays_only(server):
+    tracker = LiveZoneTracker(717465)
+    tracker.poll()
+    server.answers['game_timestamps'] = ['t0', 't1', 't2']
+    server.answers['game_diff'] = [{'diff': [
+        {'op': 'replace', 'path': '/metaData/timeStamp', 'value': 't2'},
+        {'op': 'replace', 'path': '/liveData/plays/allPlays/1/about/isComplete', 'value': True},
+        {'op': 'add', 'path': '/liveData/plays/allPlays/-', 'value': _play(102)},
+        {'op': 'replace', 'path': '/gameData/status/abstractGameState', 'value': 'Final'},
+    ]}]
+
+    assert tracker.poll() == 2
+    assert tracker.processed_plays == 3
+    assert [_pitches(tracker, batter) for batter in (100, 101, 102)] == [2, 2, 2]
+    assert tracker.final
+    assert server.calls == ['game', 'game_timestamps', 'game_diff']
+
+
+def test_poll_without_new_timecode_requests_no_diff(server):
+    tracker = LiveZoneTracker(717465)
+    tracker.poll()
+    server.answers['game_timestamps'] = ['t0', 't1']
+
+    assert tracker.poll() == 0
+    assert server.calls == ['game', 'game_timestamps']
+
+
+def test_patch_that_does_not_apply_reloads_the_feed(server):
+    tracker = LiveZoneTracker(717465)
+    tracker.poll()
+    server.answers['game_timestamps'] = ['t1', 't2']
+    server.answers['game_diff'] = [{'diff': [{'op': 'remove', 'path': '/liveData/plays/allPlays/7'}]}]
+    server.answers['game'] = _feed([_play(100), _play(101), _play(102)], 't2')
+
+    assert tracker.poll() == 2
+    assert server.calls == ['game', 'game_timestamps', 'game_diff', 'game']
+
+
+def test_plays_taken_back_are_counted_again(server):
+    tracker = LiveZoneTracker(717465)
+    tracker.update(_feed([_play(100), _play(101)], 't1'))
+
+    assert tracker.update(_feed([_play(100)], 't2')) == 1
+    assert (_pitches(tracker, 100), _pitches(tracker, 101)) == (2, 0)
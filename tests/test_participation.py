@@ -0,0 +1,46 @@
+import threading
+from types import SimpleNamespace
+
+from baseball_analysis.participation import ParticipationIndex
+
+
+def _game(gamepk, batters, pitchers):
+    return SimpleNamespace(gamepk=gamepk, rows_by_batter={batter: None for batter in batters},
+                           columns={'pitcher': list(pitchers)})
+
+
+def test_last_games_in_date_order():
+    index = ParticipationIndex()
+    games = [_game(700000 + day, [100, 101], [200]) for day in range(1, 8)]
+    index.add_games(games, {game.gamepk: f'2023-06-0{game.gamepk - 700000}' for game in games})
+
+    assert index.last_games([100], last_n=3, start_date='2023-06-02', end_date='2023-06-06') == {
+        100: [700004, 700005, 700006]}
+    assert index.last_games([200], last_n=1, role='pitcher') == {200: [700007]}
+    assert index.add_games(games[:2], {}) == 0
+
+
+def test_lookups_during_concurrent_adds():
+    index = ParticipationIndex()
+    batters = list(range(100, 120))
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        # Every batter plays every game, so a consistent read gives them all the same games
+        while not stop.is_set():
+            last_games = list(index.last_games(batters, last_n=50).values())
+            if any(gamepks != last_games[0] for gamepks in last_games):
+                errors.append(last_games)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for gamepk in range(700001, 700201):
+        index.add_games([_game(gamepk, batters, [200])], {gamepk: f'2023-{4 + gamepk % 6:02d}-{1 + gamepk % 28:02d}'})
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert not errors
+    assert len(index) == 200 * 21
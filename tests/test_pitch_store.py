@@ -0,0 +1,42 @@
+import numpy as np
+
+from baseball_analysis import compute_zone_metrics
+from baseball_analysis import set_data_source
+from baseball_analysis.pitch_store import PitchStore
+from baseball_analysis.pitch_table import PITCH_COLUMNS
+from baseball_analysis.pitch_table import PITCH_DTYPES
+from baseball_analysis.pitch_table import columns_to_table
+
+
+def _one_pitch_table():
+    columns = {column: [None] for column in PITCH_COLUMNS}
+    columns.update(game_pk=[700001], batter=[100], pitcher=[200], zone=[5], call_code=['C'],
+                   call_description=['Called Strike'], description=['Called Strike'], is_in_play=[False],
+                   is_out=[False], is_at_bat=[False], balls=[0], strikes=[1], is_sac_fly=[False],
+                   balls_before=[0], strikes_before=[0], pitch_hand=['R'], pitch_type=['FF'], px=[0.1], pz=[2.5])
+    return columns_to_table(columns)
+
+
+def test_read_without_matches_keeps_column_dtypes(tmp_path):
+    store = PitchStore(tmp_path)
+    store.append(_one_pitch_table(), '2023-06-01')
+
+    table = store.read(batter_ids=[999])
+
+    assert len(table) == 0
+    for column, dtype in PITCH_DTYPES.items():
+        assert table[column].dtype == np.dtype(dtype), column
+
+
+def test_player_without_stored_games(tmp_path):
+    store = PitchStore(tmp_path)
+    store.append(_one_pitch_table(), '2023-06-01')
+
+    set_data_source(store)
+    try:
+        metrics = compute_zone_metrics([999], from_date='2023-06-05')
+    finally:
+        set_data_source(None)
+
+    assert metrics['batting_average'] == {999: {}}
+    assert all(value == 0.0 for grids in metrics.values() for value in grids[999].values())
@@ -0,0 +1,45 @@
+from baseball_analysis import add_hook
+from baseball_analysis import remove_hook
+from baseball_analysis import render_strike_zones
+from baseball_analysis import set_render_cache
+from baseball_analysis import visualization
+from baseball_analysis.cache import RenderCache
+
+
+def test_render_cache_hit_and_miss():
+    renders = RenderCache(max_bytes=10)
+    events = []
+    add_hook(events.append)
+    try:
+        assert renders.get('key') is None
+        renders.set('key', 'Mike Trout', b'png')
+        assert renders.get('key') == ('Mike Trout', b'png')
+        renders.set('large', 'Mike Trout', b'x' * 11)
+        assert renders.get('large') is None
+    finally:
+        remove_hook(events.append)
+
+    assert [event['name'] for event in events if event.get('source') == 'render'] == [
+        'cache_misses', 'cache_hits', 'cache_misses']
+    assert renders.size == 3
+
+
+def test_cache_hit_skips_name_lookup(monkeypatch):
+    lookups = []
+
+    def lookup_player_names(player_ids):
+        lookups.append(list(player_ids))
+        return {player_id: f'Player {player_id}' for player_id in player_ids}
+
+    monkeypatch.setattr(visualization, 'lookup_player_names', lookup_player_names)
+    player_data = {545361: {(5, 1): 0.3}, 660271: {(5, 1): 0.1}}
+    set_render_cache(RenderCache())
+    try:
+        first = render_strike_zones(player_data, fmt='svg')
+        second = render_strike_zones(player_data, fmt='svg')
+    finally:
+        set_render_cache(None)
+
+    assert second == first
+    assert list(first) == ['Player 545361', 'Player 660271']
+    assert lookups == [[545361, 660271]]
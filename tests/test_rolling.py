@@ -0,0 +1,32 @@
+from baseball_analysis import data_fetch
+from baseball_analysis.data_fetch import IndexedGame
+from baseball_analysis.rolling import GameZonePartials
+from baseball_analysis.rolling import update_game_partials
+
+
+def test_game_without_rows_is_not_downloaded_again(monkeypatch):
+    schedule = [{'game_id': 700001, 'game_date': '2023-06-01', 'status': 'Final'}]
+    downloads = []
+
+    def fetch_scheduled_games(games, max_workers=1, requests_per_second=None):
+        for game in games:
+            downloads.append(game['game_id'])
+            yield game, IndexedGame(game['game_id'], {'allPlays': []})
+
+    monkeypatch.setattr(data_fetch, 'schedule_for_lineup', lambda *args: schedule)
+    monkeypatch.setattr(data_fetch, 'fetch_scheduled_games', fetch_scheduled_games)
+    partials = GameZonePartials()
+
+    assert update_game_partials(partials, [100], '2023-06-01', '2023-06-01') == 1
+    assert update_game_partials(partials, [100], '2023-06-01', '2023-06-02') == 0
+    assert downloads == [700001]
+    assert len(partials) == 0
+
+
+def test_scanned_games_survive_save_and_load(tmp_path):
+    partials = GameZonePartials()
+    partials.add_games([IndexedGame(700001, {'allPlays': []})], {700001: '2023-06-01'})
+    path = tmp_path / 'partials.npz'
+    partials.save(path)
+
+    assert GameZonePartials.load(path).held_gamepks() == {700001}
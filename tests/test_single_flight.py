@@ -0,0 +1,81 @@
+import threading
+
+import numpy as np
+
+from baseball_analysis import add_hook
+from baseball_analysis import remove_hook
+from baseball_analysis.cache import SingleFlightCache
+
+DOCUMENT = {'allPlays': []}
+
+
+def _concurrent_gets(shared, fetch, release, callers):
+    # Starts the callers and lets the fetch finish once all but the leader wait on it
+    coalesced = threading.Semaphore(0)
+    results = []
+
+    def on_event(event):
+        if event['name'] == 'coalesced_requests':
+            coalesced.release()
+
+    def get():
+        try:
+            results.append(shared.get('game', fetch))
+        except RuntimeError as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=get) for _ in range(callers)]
+    add_hook(on_event)
+    try:
+        for thread in threads:
+            thread.start()
+        for _ in range(callers - 1):
+            assert coalesced.acquire(timeout=5)
+        release.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        remove_hook(on_event)
+    return results
+
+
+def test_concurrent_gets_share_one_fetch():
+    shared = SingleFlightCache()
+    release = threading.Event()
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        release.wait()
+        return DOCUMENT
+
+    assert _concurrent_gets(shared, fetch, release, 8) == [DOCUMENT] * 8
+    assert len(fetches) == 1
+    assert shared.get('game', lambda: None) is DOCUMENT
+
+
+def test_concurrent_gets_share_the_error():
+    shared = SingleFlightCache()
+    release = threading.Event()
+    error = RuntimeError('unavailable')
+
+    def fetch():
+        release.wait()
+        raise error
+
+    assert _concurrent_gets(shared, fetch, release, 4) == [error] * 4
+    assert len(shared) == 0
+
+
+def test_lru_evicts_least_recently_used_by_size():
+    shared = SingleFlightCache(max_bytes=250)
+    for key in ('a', 'b'):
+        shared.get(key, lambda: np.zeros(100, dtype=np.int8))
+    shared.get('a', lambda: None)
+    shared.get('c', lambda: np.zeros(100, dtype=np.int8))
+
+    assert shared.size == 200
+    assert set(shared._lru.entries) == {'a', 'c'}
+
+    shared.get('big', lambda: np.zeros(300, dtype=np.int8))
+    assert 'big' not in shared._lru.entries
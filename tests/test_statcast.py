@@ -0,0 +1,40 @@
+from datetime import date, timedelta
+
+import pandas as pd
+
+from baseball_analysis import statcast
+from baseball_analysis.statcast import StatcastSource
+
+
+def _count_downloads(monkeypatch):
+    downloads = []
+
+    def download(first_day, last_day):
+        downloads.append(first_day)
+        return pd.DataFrame({'game_date': [first_day.isoformat()], 'game_pk': [1], 'batter': [100]})
+
+    monkeypatch.setattr(statcast, 'download_statcast', download)
+    return downloads
+
+
+def test_settled_chunk_is_cached(tmp_path, monkeypatch):
+    downloads = _count_downloads(monkeypatch)
+    source = StatcastSource(tmp_path, chunk_days=1, settle_days=2)
+    day = date.today() - timedelta(days=3)
+
+    source._load_chunk(day, day)
+    source._load_chunk(day, day)
+
+    assert downloads == [day]
+
+
+def test_recent_chunk_is_downloaded_again(tmp_path, monkeypatch):
+    downloads = _count_downloads(monkeypatch)
+    source = StatcastSource(tmp_path, chunk_days=1, settle_days=2)
+    yesterday = date.today() - timedelta(days=1)
+
+    source._load_chunk(yesterday, yesterday)
+    source._load_chunk(yesterday, yesterday)
+
+    assert downloads == [yesterday, yesterday]
+    assert list(tmp_path.iterdir()) == []
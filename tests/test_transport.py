@@ -0,0 +1,89 @@
+import io
+import json
+
+import pytest
+import requests
+
+from baseball_analysis import transport as transport_module
+from baseball_analysis.transport import BASE_URL
+from baseball_analysis.transport import Transport
+from baseball_analysis.transport import endpoint_url
+
+
+def _response(status, document=None, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b'' if document is None else json.dumps(document).encode()
+    response.headers.update(headers or {})
+    response.raw = io.BytesIO(response._content)
+    response.url = BASE_URL
+    return response
+
+
+class FakeSession:
+    """Answers requests from a list of responses or exceptions, recording the headers sent."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.sent_headers = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.sent_headers.append(dict(headers or {}))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def _transport(answers, monkeypatch, **kwargs):
+    delays = []
+    monkeypatch.setattr(transport_module.time, 'sleep', delays.append)
+    client = Transport(**kwargs)
+    client.session = FakeSession(answers)
+    return client, delays
+
+
+def test_endpoint_url_fills_path_and_query_parameters():
+    url, query = endpoint_url('game_playByPlay', {'gamePk': 717465, 'fields': 'allPlays'})
+
+    assert url == BASE_URL + 'v1/game/717465/playByPlay'
+    assert query == {'fields': 'allPlays'}
+
+
+def test_endpoint_url_rejects_unknown_endpoint_and_missing_path_parameter():
+    with pytest.raises(ValueError):
+        endpoint_url('nope', {})
+    with pytest.raises(ValueError):
+        endpoint_url('game', {})
+
+
+def test_retries_with_bounded_backoff(monkeypatch):
+    answers = [_response(503), requests.ConnectionError(), _response(429, headers={'Retry-After': '100'}),
+               _response(200, {'ok': True})]
+    client, delays = _transport(answers, monkeypatch, retries=3, backoff=0.5, max_backoff=10)
+
+    assert client.get('people', {'personIds': 1}) == {'ok': True}
+    assert len(delays) == 3
+    assert 0 <= delays[0] <= 0.5
+    assert 0 <= delays[1] <= 1.0
+    assert delays[2] == 10
+
+
+def test_gives_up_after_the_last_retry(monkeypatch):
+    client, delays = _transport([_response(500)] * 3, monkeypatch, retries=2)
+
+    with pytest.raises(requests.HTTPError):
+        client.get('people', {'personIds': 1})
+    assert len(delays) == 2
+
+
+def test_not_modified_answer_reuses_the_kept_document(monkeypatch):
+    answers = [_response(200, {'plays': [1]}, {'ETag': '"v1"'}), _response(304)]
+    client, _ = _transport(answers, monkeypatch)
+
+    first = client.get('game_playByPlay', {'gamePk': 1})
+    first['plays'].append(2)
+    second = client.get('game_playByPlay', {'gamePk': 1})
+
+    assert second == {'plays': [1]}
+    assert client.session.sent_headers == [{}, {'If-None-Match': '"v1"'}]